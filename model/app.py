@@ -1,27 +1,57 @@
-import gradio as gr
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from deep_translator import GoogleTranslator
 import os
 from dotenv import load_dotenv
-import tempfile
 from datetime import datetime
 import json
+import re
+import sys
+import functools
+import threading
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from symptom_classifier import SymptomClassifier
+from question_bank import ensure_question_bank, load_question_bank
+from translation_cache import TranslationCache
+from conversation_state import ConversationState, CATEGORY_MARKER
+from session_store import SessionStore
+from segmented_translation import SegmentedTranslator
+from script_detection import detect_language
+from symptom_cache import SymptomDetectionCache
+from diagnosis_memo import DiagnosisMemo
+from single_flight import SingleFlight, fingerprint
+from gemini_gateway import GeminiGateway
+from turn_budget import TurnBudget
+from reports import create_bulletproof_report, render_report_bytes
+from report_pool import ReportPool, ReportQueueFull
+from report_store import MemoryReportStore, ReportStore, report_key
+from assessment_log import AssessmentLog
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-model = genai.GenerativeModel(
-    model_name="gemini-2.5-flash",
-    safety_settings={
-        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-    }
-)
+# Gemini client, created on first use (google.generativeai takes ~0.5s to import)
+model = None
+_model_lock = threading.Lock()
+
+def get_gemini_model():
+    """Configure Gemini and build the model on first use"""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+                from google.generativeai.types import HarmCategory, HarmBlockThreshold
+                genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+                model = genai.GenerativeModel(
+                    model_name="gemini-2.5-flash",
+                    safety_settings={
+                        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+                        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+                        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+                        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+                    }
+                )
+    return model
 
 # CORRECTED language mapping with proper codes for GoogleTranslator
 LANGUAGES = {
@@ -1005,33 +1035,280 @@ SYMPTOM_QUESTIONS = {
     ]
 }
 
-# Global conversation storage
-conversation_data = {}
+# Body-system taxonomy over SYMPTOM_QUESTIONS (same grouping as the section comments above)
+SYMPTOM_SYSTEMS = {
+    'digestive': {
+        'label': 'Digestive system',
+        'categories': (
+            'stomach_pain', 'nausea', 'vomiting', 'diarrhea', 'constipation', 'heartburn',
+            'bloating', 'loss_of_appetite', 'abdominal_cramps', 'indigestion', 'acid_reflux',
+            'stomach_ulcer', 'gas_problems', 'food_poisoning', 'gallbladder_pain',
+            'liver_problems', 'hemorrhoids', 'irritable_bowel', 'peptic_ulcer', 'gastroenteritis'
+        )
+    },
+    'respiratory': {
+        'label': 'Respiratory system',
+        'categories': (
+            'cough', 'shortness_of_breath', 'wheezing', 'chest_congestion', 'runny_nose',
+            'stuffy_nose', 'sneezing', 'sinus_pressure', 'pneumonia_symptoms', 'bronchitis',
+            'asthma_attack', 'allergic_rhinitis', 'hiccups', 'laryngitis', 'sleep_apnea'
+        )
+    },
+    'cardiovascular': {
+        'label': 'Cardiovascular system',
+        'categories': (
+            'chest_pain', 'heart_palpitations', 'high_blood_pressure', 'swelling',
+            'irregular_heartbeat', 'low_blood_pressure', 'rapid_heartbeat', 'slow_heartbeat',
+            'varicose_veins', 'blood_clot', 'heart_murmur', 'angina'
+        )
+    },
+    'neurological': {
+        'label': 'Neurological system',
+        'categories': (
+            'headache', 'dizziness', 'migraine', 'memory_problems', 'numbness', 'seizure',
+            'confusion', 'coordination_problems', 'tremor', 'weakness', 'fainting',
+            'vision_problems', 'speech_problems', 'balance_problems', 'cognitive_decline',
+            'stroke_symptoms', 'nerve_pain', 'concussion'
+        )
+    },
+    'musculoskeletal': {
+        'label': 'Musculoskeletal system',
+        'categories': (
+            'back_pain', 'neck_pain', 'joint_pain', 'muscle_pain', 'arthritis', 'muscle_cramps',
+            'stiffness', 'muscle_weakness', 'bone_pain', 'tendon_pain', 'ligament_injury',
+            'fracture_symptoms', 'spinal_problems', 'shoulder_pain', 'knee_pain'
+        )
+    },
+    'general': {
+        'label': 'General / constitutional',
+        'categories': (
+            'fatigue', 'fever', 'weight_loss', 'weight_gain', 'night_sweats', 'chills', 'malaise',
+            'body_aches', 'dehydration', 'loss_of_energy', 'insomnia', 'excessive_sweating'
+        )
+    },
+    'skin': {
+        'label': 'Skin & dermatological',
+        'categories': (
+            'rash', 'itching', 'hair_loss', 'skin_changes', 'acne', 'dry_skin', 'oily_skin',
+            'wounds_healing', 'burns', 'bruising'
+        )
+    },
+    'eyes': {
+        'label': 'Eyes & vision',
+        'categories': (
+            'eye_pain', 'blurry_vision', 'double_vision', 'eye_discharge', 'light_sensitivity'
+        )
+    },
+    'ears': {
+        'label': 'Ears & hearing',
+        'categories': (
+            'ear_pain', 'hearing_loss', 'ear_ringing', 'ear_discharge', 'ear_pressure'
+        )
+    },
+    'throat_mouth': {
+        'label': 'Throat & mouth',
+        'categories': (
+            'sore_throat', 'mouth_sores', 'bad_breath', 'dry_mouth', 'swollen_glands'
+        )
+    },
+    'genitourinary': {
+        'label': 'Genitourinary system',
+        'categories': (
+            'urinary_problems', 'kidney_pain', 'bladder_problems', 'prostate_problems',
+            'menstrual_problems', 'sexual_health', 'pelvic_pain', 'uti_symptoms', 'incontinence',
+            'erectile_dysfunction'
+        )
+    },
+    'mental_health': {
+        'label': 'Mental health',
+        'categories': (
+            'anxiety', 'depression', 'mood_swings', 'stress', 'panic_attacks', 'sleep_disorders',
+            'concentration_problems'
+        )
+    }
+}
+
+CATEGORY_SYSTEM = {
+    category: system for system, info in SYMPTOM_SYSTEMS.items() for category in info['categories']
+}
+
+# Local classifier answers first; Gemini is only asked below this confidence (0-1).
+# `benchmark.py local-classifier`: precision is 1.0 from 0.5 up; 0.6 keeps a margin
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.6'))
+
+@functools.lru_cache(maxsize=None)
+def get_symptom_classifier():
+    """Offline classifier, indexed on first use"""
+    return SymptomClassifier(SYMPTOM_QUESTIONS)
+
+# Gemini classification: 'flat' (all categories at once) or 'hierarchical' (system, then category).
+# Flat until `benchmark.py classification-prompts --live` shows hierarchical paying off: with
+# few local hints it makes 2-3 sequential calls to save ~40 of ~514 prompt tokens
+SYMPTOM_CLASSIFICATION = os.getenv('SYMPTOM_CLASSIFICATION', 'flat')
+# A weaker local match can pick the body system and skip stage 1, if its system
+# is clearly ahead of the next one (`benchmark.py classification-prompts` counts wrong hints)
+LOCAL_SYSTEM_HINT_THRESHOLD = float(os.getenv('LOCAL_SYSTEM_HINT_THRESHOLD', '0.45'))
+LOCAL_SYSTEM_HINT_MARGIN = float(os.getenv('LOCAL_SYSTEM_HINT_MARGIN', '0.2'))
+# Stage 2 answer for "the complaint isn't in this body system"
+NO_CATEGORY = 'none'
+
+# Gemini classifications reused for identical and near-identical complaints
+symptom_detection_cache = SymptomDetectionCache(
+    max_entries=int(os.getenv('SYMPTOM_CACHE_SIZE', '5000')),
+    min_similarity=int(os.getenv('SYMPTOM_CACHE_SIMILARITY', '90')),
+    min_edit_similarity=int(os.getenv('SYMPTOM_CACHE_EDIT_SIMILARITY', '80'))
+)
+
+@functools.lru_cache(maxsize=None)
+def get_question_translations():
+    """Offline translations of SYMPTOM_QUESTIONS (built by question_bank.py), loaded on first use"""
+    return load_question_bank()
+
+# Build the question bank at deployment/startup instead of relying on a manual step
+QUESTION_BANK_AUTOBUILD = os.getenv('QUESTION_BANK_AUTOBUILD', '1') != '0'
+
+def refresh_question_bank():
+    """Build a missing/stale question bank and start serving it"""
+    try:
+        if ensure_question_bank(SYMPTOM_QUESTIONS, LANGUAGES):
+            get_question_translations.cache_clear()
+    except Exception as e:
+        print(f"Question bank build failed: {e}")
+
+def start_question_bank_build():
+    """Background build at startup; chat keeps using live translation until it is done"""
+    if QUESTION_BANK_AUTOBUILD:
+        threading.Thread(target=refresh_question_bank, daemon=True, name='question-bank').start()
+
+# Translation memo cache: in-process LRU in front of SQLite (template strings only)
+@functools.lru_cache(maxsize=None)
+def get_translation_cache():
+    """Translation cache, opening its SQLite file on first use rather than at import"""
+    return TranslationCache(
+        os.getenv('TRANSLATION_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'translations.sqlite3')),
+        max_entries=int(os.getenv('TRANSLATION_CACHE_SIZE', '2048')),
+        ttl_seconds=int(os.getenv('TRANSLATION_CACHE_TTL', str(30 * 24 * 3600)))
+    )
+
+_translators = {}
+
+# Opt-in: ask Gemini for the diagnosis directly in the session language (one network hop)
+LOCALIZED_DIAGNOSIS = os.getenv('LOCALIZED_DIAGNOSIS', '').lower() in ('1', 'true', 'yes')
+
+# Long responses are split into segments and translated in parallel
+SEGMENTED_TRANSLATION_MIN_CHARS = int(os.getenv('SEGMENTED_TRANSLATION_MIN_CHARS', '300'))
+
+@functools.lru_cache(maxsize=None)
+def get_segmented_translator():
+    return SegmentedTranslator(max_workers=int(os.getenv('TRANSLATION_WORKERS', '4')))
+
+# Opt-in memo of finished diagnoses for repeated (category, answers, age band, gender)
+DIAGNOSIS_MEMO = os.getenv('DIAGNOSIS_MEMO', '').lower() in ('1', 'true', 'yes')
+diagnosis_memo = DiagnosisMemo(
+    max_entries=int(os.getenv('DIAGNOSIS_MEMO_SIZE', '1000')),
+    ttl_seconds=int(os.getenv('DIAGNOSIS_MEMO_TTL', str(24 * 3600)))
+) if DIAGNOSIS_MEMO else None
+
+# Reports render in worker processes so a burst of clicks can't stall chat turns
+report_pool = ReportPool(
+    max_workers=int(os.getenv('REPORT_WORKERS', '2')),
+    max_pending=int(os.getenv('REPORT_MAX_PENDING', '8')),
+    use_processes=os.getenv('REPORT_POOL', 'processes') != 'threads',
+    start_method=os.getenv('REPORT_START_METHOD') or None
+)
+
+# Rendered reports, content-addressed so repeated clicks reuse one file
+REPORT_TTL_SECONDS = int(os.getenv('REPORT_TTL', str(24 * 3600)))
+
+@functools.lru_cache(maxsize=None)
+def get_report_store():
+    """Report store, created with its directory and janitor thread on the first report"""
+    return ReportStore(
+        os.getenv('REPORT_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'reports')),
+        max_bytes=int(os.getenv('REPORT_STORE_MB', '256')) * 1024 * 1024,
+        ttl_seconds=REPORT_TTL_SECONDS
+    )
+
+# REPORT_IN_MEMORY: reports are rendered into memory and streamed from
+# REPORT_DOWNLOAD_PATH (a route on main.py's server) without touching the disk
+REPORT_IN_MEMORY = os.getenv('REPORT_IN_MEMORY', '').lower() in ('1', 'true', 'yes')
+REPORT_DOWNLOAD_PATH = '/reports'
+REPORT_CHUNK_BYTES = 64 * 1024
+REPORT_MIMETYPES = {'.pdf': 'application/pdf', '.txt': 'text/plain; charset=utf-8'}
+memory_reports = MemoryReportStore(
+    max_bytes=int(os.getenv('REPORT_MEMORY_MB', '64')) * 1024 * 1024,
+    ttl_seconds=int(os.getenv('REPORT_MEMORY_TTL', '3600'))
+) if REPORT_IN_MEMORY else None
+
+# Opt-in: completed assessments (patient names, ages, diagnoses) for `bulk_export.py`,
+# one JSON line each in daily files next to ASSESSMENT_LOG_PATH, deleted after the retention
+ASSESSMENT_LOG_PATH = os.getenv('ASSESSMENT_LOG_PATH', '')
+assessment_log = AssessmentLog(
+    ASSESSMENT_LOG_PATH,
+    retention_days=int(os.getenv('ASSESSMENT_LOG_RETENTION_DAYS', '7'))
+) if ASSESSMENT_LOG_PATH else None
+
+# Deadline for one chat turn across all of its upstream calls
+TURN_BUDGET_SECONDS = float(os.getenv('TURN_BUDGET_SECONDS', '20'))
+DEGRADED_NOTICE = "⏱️ Part of this reply used an offline fallback to keep the response time short."
+
+# Fixed chat replies; with the questions these are the only translations kept on disk
+WELCOME_PROMPT = "Please describe your symptoms to get started."
+GREETING_REPLY = "👋 Hello! I'm your Smart Symptom Checker. Please describe your symptoms in detail."
+MORE_DETAIL_PROMPT = "🤔 Please describe your symptoms or health concerns in more detail."
+ACK_LEAD_IN = "I understand you're experiencing:"
+ACK_FOLLOW_UP = "Let me ask some targeted questions to help assess your condition."
+GENERIC_ACK = "I understand your health concern. Let me ask some questions to help assess your condition."
+MAIN_SYMPTOM_PROMPT = "Please describe your main symptom so I can help assess your condition."
+
+def estimate_session_bytes(session):
+    """Approximate session footprint without walking the conversation"""
+    size = sys.getsizeof(session)
+    for key, value in session.items():
+        size += value.approx_bytes() if key == 'state' else sys.getsizeof(value)
+    return size
+
+# Per-session conversation storage (Gradio session hash -> profile, diagnosis, state)
+DEFAULT_SESSION_ID = 'default'
+session_store = SessionStore(
+    max_sessions=int(os.getenv('SESSION_MAX_COUNT', '1000')),
+    max_bytes=int(os.getenv('SESSION_MAX_MB', '64')) * 1024 * 1024,
+    idle_ttl=int(os.getenv('SESSION_IDLE_TTL', '3600')),
+    size_of=estimate_session_bytes
+)
+
+# Concurrent identical Gemini / translator requests share one upstream call
+upstream_flights = SingleFlight()
+
+# Every Gemini request goes through the gateway: quota limiter, retries, circuit breaker
+gemini_gateway = GeminiGateway(
+    requests_per_minute=int(os.getenv('GEMINI_RPM', '60')),
+    burst=int(os.getenv('GEMINI_BURST', '10')),
+    max_retries=int(os.getenv('GEMINI_MAX_RETRIES', '3')),
+    failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', '5')),
+    reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET', '30')),
+    max_queue_wait=float(os.getenv('GEMINI_MAX_QUEUE_WAIT', '10'))
+)
+
+def gemini_generate(prompt):
+    """model.generate_content via the gateway, shared by concurrent callers with the same prompt"""
+    return upstream_flights.do(fingerprint('gemini', prompt), gemini_gateway.call, get_gemini_model().generate_content, prompt)
+
+async def gemini_generate_async(prompt):
+    """model.generate_content_async via the gateway, shared by concurrent callers with the same prompt"""
+    return await upstream_flights.do_async(
+        fingerprint('gemini', prompt), gemini_gateway.call_async, get_gemini_model().generate_content_async, prompt
+    )
 
 def detect_language_from_script(text):
     """Detect language from script"""
-    if any('\u0900' <= char <= '\u097F' for char in text):
-        return 'hi'  # Hindi
-    elif any('\u0C00' <= char <= '\u0C7F' for char in text):
-        return 'te'  # Telugu  
-    elif any('\u0B80' <= char <= '\u0BFF' for char in text):
-        return 'ta'  # Tamil
-    elif any('\u0980' <= char <= '\u09FF' for char in text):
-        return 'bn'  # Bengali
-    elif any('\u0A80' <= char <= '\u0AFF' for char in text):
-        return 'gu'  # Gujarati
-    elif any('\u0C80' <= char <= '\u0CFF' for char in text):
-        return 'kn'  # Kannada
-    elif any('\u0D00' <= char <= '\u0D7F' for char in text):
-        return 'ml'  # Malayalam
-    else:
-        return 'en'  # English
+    return detect_language(text).language
 
-def ai_smart_symptom_detection(text, detected_lang):
-    """AI-powered symptom detection and translation"""
+def build_symptom_detection_prompt(text):
+    """Flat Gemini prompt for free-text symptom classification (every category)"""
     categories_list = ", ".join(SYMPTOM_QUESTIONS.keys())
     
-    prompt = f"""You are a medical AI assistant. Analyze: "{text}"
+    return f"""You are a medical AI assistant. Analyze: "{text}"
 
 Provide:
 TRANSLATION: [English translation if needed]
@@ -1040,34 +1317,253 @@ CONFIDENCE: [1-10]
 
 Choose the most specific category that matches."""
 
-    try:
-        response = model.generate_content(prompt)
-        result = response.text.strip()
-        
-        translation = ""
-        symptom_category = ""
-        confidence = 0
-        
-        for line in result.split('\n'):
-            if line.startswith('TRANSLATION:'):
-                translation = line.replace('TRANSLATION:', '').strip()
-            elif line.startswith('SYMPTOM_CATEGORY:'):
-                symptom_category = line.replace('SYMPTOM_CATEGORY:', '').strip()
-            elif line.startswith('CONFIDENCE:'):
-                try:
-                    confidence = int(line.replace('CONFIDENCE:', '').strip())
-                except:
-                    confidence = 5
-        
-        if symptom_category not in SYMPTOM_QUESTIONS:
-            symptom_category = None
-            
-        return translation, symptom_category, confidence
+@functools.lru_cache(maxsize=None)
+def system_selection_template():
+    """Stage 1 prompt template (built once): pick the body system"""
+    systems_list = "\n".join(
+        f"- {system}: {info['label']} (e.g. {', '.join(info['categories'][:4])})"
+        for system, info in SYMPTOM_SYSTEMS.items()
+    )
+    return f"""You are a medical AI assistant. Analyze: "{{text}}"
+
+Which body system does the complaint belong to?
+{systems_list}
+
+Provide:
+TRANSLATION: [English translation if needed]
+BODY_SYSTEM: [one of: {', '.join(SYMPTOM_SYSTEMS)}]"""
+
+@functools.lru_cache(maxsize=None)
+def category_selection_template(system):
+    """Stage 2 prompt template (built once per system): pick the category"""
+    categories_list = ", ".join(SYMPTOM_SYSTEMS[system]['categories'])
+    return f"""You are a medical AI assistant. Analyze: "{{text}}"
+The complaint concerns the {SYMPTOM_SYSTEMS[system]['label'].lower()}.
+
+Provide:
+TRANSLATION: [English translation if needed]
+SYMPTOM_CATEGORY: [one of: {categories_list}, or {NO_CATEGORY} if none of these fits]
+CONFIDENCE: [1-10]
+
+Choose the most specific category that matches."""
+
+def build_system_selection_prompt(text):
+    return system_selection_template().replace('{text}', text)
+
+def build_category_selection_prompt(text, system):
+    return category_selection_template(system).replace('{text}', text)
+
+def parse_body_system(result):
+    """BODY_SYSTEM from the stage 1 reply, or None"""
+    for line in result.split('\n'):
+        if line.startswith('BODY_SYSTEM:'):
+            system = line.replace('BODY_SYSTEM:', '').strip().lower()
+            return system if system in SYMPTOM_SYSTEMS else None
+    return None
+
+def local_system_hint(text):
+    """Body system of a moderately confident local match that no other system comes close to, or None"""
+    classifier = get_symptom_classifier()
+    category, confidence = classifier.classify(text)
+    if not category or confidence < LOCAL_SYSTEM_HINT_THRESHOLD:
+        return None
+    system = CATEGORY_SYSTEM.get(category)
+    best, runner_up = 0.0, 0.0
+    for other, score in zip(classifier.categories, classifier.scores(text)):
+        if CATEGORY_SYSTEM.get(other) == system:
+            best = max(best, score)
+        else:
+            runner_up = max(runner_up, score)
+    return system if best - runner_up >= LOCAL_SYSTEM_HINT_MARGIN else None
+
+def chose_no_category(result):
+    """True when the stage 2 reply says no category of the system fits"""
+    for line in result.split('\n'):
+        if line.startswith('SYMPTOM_CATEGORY:'):
+            return line.replace('SYMPTOM_CATEGORY:', '').strip().lower() == NO_CATEGORY
+    return False
+
+def parse_symptom_detection(result):
+    """Parse the TRANSLATION / SYMPTOM_CATEGORY / CONFIDENCE reply"""
+    translation = ""
+    symptom_category = ""
+    confidence = 0
+    
+    for line in result.split('\n'):
+        if line.startswith('TRANSLATION:'):
+            translation = line.replace('TRANSLATION:', '').strip()
+        elif line.startswith('SYMPTOM_CATEGORY:'):
+            symptom_category = line.replace('SYMPTOM_CATEGORY:', '').strip()
+        elif line.startswith('CONFIDENCE:'):
+            try:
+                confidence = int(line.replace('CONFIDENCE:', '').strip())
+            except:
+                confidence = 5
+    
+    if symptom_category not in SYMPTOM_QUESTIONS:
+        symptom_category = None
         
+    return translation, symptom_category, confidence
+
+def classify_symptom_locally(text):
+    """Offline classifier or cached Gemini result, or None when Gemini should decide"""
+    local_category, local_confidence = get_symptom_classifier().classify(text)
+    if local_category and local_confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+        print(f"DEBUG: Local classifier matched '{local_category}' ({local_confidence:.2f})")
+        return text, local_category, max(6, round(local_confidence * 10))
+    
+    cached = symptom_detection_cache.get(text)
+    if cached:
+        category, confidence = cached
+        print(f"DEBUG: Symptom cache hit '{category}'")
+        return text, category, confidence
+    return None
+
+def remember_symptom_detection(text, result):
+    """Cache successful Gemini classifications (failures are retried next time)"""
+    _, category, confidence = result
+    if category:
+        symptom_detection_cache.put(text, (category, confidence))
+    return result
+
+def ai_smart_symptom_detection(text, detected_lang):
+    """AI-powered symptom detection and translation"""
+    # Offline classifier first - avoids a Gemini round-trip for clear complaints
+    local_result = classify_symptom_locally(text)
+    if local_result:
+        return local_result
+    
+    try:
+        prompt = flat_prompt = build_symptom_detection_prompt(text)
+        if SYMPTOM_CLASSIFICATION == 'hierarchical':
+            system = local_system_hint(text)
+            if system is None:
+                system = parse_body_system(gemini_generate(build_system_selection_prompt(text)).text)
+            if system:
+                prompt = build_category_selection_prompt(text, system)
+        response = gemini_generate(prompt)
+        if prompt != flat_prompt and chose_no_category(response.text):
+            # Wrong body system (e.g. a misleading local hint): choose among every category
+            print(f"DEBUG: No category fits the {system} system, using the flat prompt")
+            response = gemini_generate(flat_prompt)
+        return remember_symptom_detection(text, parse_symptom_detection(response.text.strip()))
+    except Exception as e:
+        print(f"AI symptom detection failed: {e}")
+        return text, None, 0
+
+async def ai_smart_symptom_detection_async(text, detected_lang):
+    """Async variant of ai_smart_symptom_detection"""
+    local_result = classify_symptom_locally(text)
+    if local_result:
+        return local_result
+    
+    try:
+        prompt = flat_prompt = build_symptom_detection_prompt(text)
+        if SYMPTOM_CLASSIFICATION == 'hierarchical':
+            system = local_system_hint(text)
+            if system is None:
+                system = parse_body_system((await gemini_generate_async(build_system_selection_prompt(text))).text)
+            if system:
+                prompt = build_category_selection_prompt(text, system)
+        response = await gemini_generate_async(prompt)
+        if prompt != flat_prompt and chose_no_category(response.text):
+            print(f"DEBUG: No category fits the {system} system, using the flat prompt")
+            response = await gemini_generate_async(flat_prompt)
+        return remember_symptom_detection(text, parse_symptom_detection(response.text.strip()))
     except Exception as e:
         print(f"AI symptom detection failed: {e}")
         return text, None, 0
 
+def get_translator(lang_code):
+    """Reuse one GoogleTranslator per target language"""
+    translator = _translators.get(lang_code)
+    if translator is None:
+        from deep_translator import GoogleTranslator
+        translator = _translators[lang_code] = GoogleTranslator(source='en', target=lang_code)
+    return translator
+
+@functools.lru_cache(maxsize=1)
+def template_texts():
+    """English strings whose translations may be stored on disk: no patient data in them"""
+    texts = {question for questions in SYMPTOM_QUESTIONS.values() for question in questions}
+    texts.update((WELCOME_PROMPT, GREETING_REPLY, MORE_DETAIL_PROMPT, ACK_LEAD_IN, ACK_FOLLOW_UP,
+                  GENERIC_ACK, MAIN_SYMPTOM_PROMPT, DEGRADED_NOTICE))
+    return frozenset(texts)
+
+def cache_translation(text, lang_code, translated):
+    """Memo a translation; only fixed template strings are persisted"""
+    get_translation_cache().put(text, lang_code, translated, persist=text in template_texts())
+
+def lookup_translation(text, lang_code):
+    """Offline translation sources: question bank first, then the memo cache"""
+    pretranslated = get_question_translations().get(lang_code, {}).get(text)
+    if pretranslated:
+        return pretranslated
+    return get_translation_cache().get(text, lang_code)
+
+def build_translation_prompt(text, language_name):
+    return f"Translate this medical text to {language_name}: {text}\n\nProvide only the translation:"
+
+def _google_translate(text, lang_code):
+    """GoogleTranslator call that fills the memo cache; raises on failure"""
+    translated = get_translator(lang_code).translate(text)
+    print(f"DEBUG: Translated '{text[:50]}...' from en to {lang_code}: '{translated[:50]}...'")
+    cache_translation(text, lang_code, translated)
+    return translated
+
+def google_translate_text(text, lang_code):
+    """_google_translate shared by concurrent callers with the same text"""
+    return upstream_flights.do(fingerprint('google', lang_code, text), _google_translate, text, lang_code)
+
+def gemini_translate_text(text, language_name, lang_code):
+    """Gemini translation fallback that fills the memo cache; raises on failure"""
+    response = gemini_generate(build_translation_prompt(text, language_name))
+    translated = response.text.strip()
+    cache_translation(text, lang_code, translated)
+    return translated
+
+def _segment_translators(language_name, lang_code):
+    """(translate_segment, fallback_segment) for SegmentedTranslator"""
+    def translate_segment(segment):
+        return lookup_translation(segment, lang_code) or google_translate_text(segment, lang_code)
+    
+    def fallback_segment(segment):
+        return gemini_translate_text(segment, language_name, lang_code)
+    
+    return translate_segment, fallback_segment
+
+def _finish_segmented_translation(text, lang_code, translated, timings):
+    print(f"DEBUG: Segmented translation to {lang_code}: {len(timings)} segments, "
+          f"slowest {max((t['seconds'] for t in timings), default=0)}s")
+    # Don't memo a response that still has untranslated segments
+    if all(timing['status'] != 'failed' for timing in timings):
+        cache_translation(text, lang_code, translated)
+    return translated
+
+def translate_long_text(text, language_name, lang_code):
+    """Translate structural segments concurrently, each with its own retries and fallback"""
+    translated, timings = get_segmented_translator().translate(text, *_segment_translators(language_name, lang_code))
+    return _finish_segmented_translation(text, lang_code, translated, timings)
+
+def translate_diagnosis_line(line, language_name):
+    """One streamed diagnosis line through the segmented translator (bounded pool, per-segment retries)"""
+    lang_code = LANGUAGES.get(language_name, 'en')
+    if lang_code == 'en' or not line.strip():
+        return line
+    return lookup_translation(line, lang_code) or translate_long_text(line, language_name, lang_code)
+
+async def translate_diagnosis_line_async(line, language_name):
+    """Async variant of translate_diagnosis_line; waits on the pool without holding a thread"""
+    lang_code = LANGUAGES.get(language_name, 'en')
+    if lang_code == 'en' or not line.strip():
+        return line
+    cached = lookup_translation(line, lang_code)
+    if cached:
+        return cached
+    future = get_segmented_translator().submit(line, *_segment_translators(language_name, lang_code))
+    translated, timings = await asyncio.wrap_future(future)
+    return _finish_segmented_translation(line, lang_code, translated, timings)
+
 def translate_to_user_language(text, language_name):
     """FIXED: Translate response back to user's language"""
     # Get the language code
@@ -1076,19 +1572,55 @@ def translate_to_user_language(text, language_name):
     if lang_code == 'en':
         return text
     
+    # Pre-translated question bank / memo cache - no network call
+    cached = lookup_translation(text, lang_code)
+    if cached:
+        return cached
+    
+    if len(text) >= SEGMENTED_TRANSLATION_MIN_CHARS and '\n' in text:
+        return translate_long_text(text, language_name, lang_code)
+    
     try:
         # Use GoogleTranslator with correct language codes
-        translator = GoogleTranslator(source='en', target=lang_code)
-        translated = translator.translate(text)
-        print(f"DEBUG: Translated '{text[:50]}...' from en to {lang_code}: '{translated[:50]}...'")
-        return translated
+        return google_translate_text(text, lang_code)
     except Exception as e:
         print(f"Translation failed: {e}")
         # Fallback to Gemini
         try:
-            prompt = f"Translate this medical text to {language_name}: {text}\n\nProvide only the translation:"
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            return gemini_translate_text(text, language_name, lang_code)
+        except:
+            return text
+
+async def translate_to_user_language_async(text, language_name):
+    """Async variant of translate_to_user_language.
+
+    deep_translator has no async API, so the GoogleTranslator call runs on
+    the default executor; the Gemini fallback uses the async generate API.
+    """
+    lang_code = LANGUAGES.get(language_name, 'en')
+    
+    if lang_code == 'en':
+        return text
+    
+    cached = lookup_translation(text, lang_code)
+    if cached:
+        return cached
+    
+    if len(text) >= SEGMENTED_TRANSLATION_MIN_CHARS and '\n' in text:
+        return await asyncio.to_thread(translate_long_text, text, language_name, lang_code)
+    
+    try:
+        # Coalesce before taking an executor thread, so waiting callers don't hold one
+        return await upstream_flights.do_async(
+            fingerprint('google', lang_code, text), asyncio.to_thread, _google_translate, text, lang_code
+        )
+    except Exception as e:
+        print(f"Translation failed: {e}")
+        try:
+            response = await gemini_generate_async(build_translation_prompt(text, language_name))
+            translated = response.text.strip()
+            cache_translation(text, lang_code, translated)
+            return translated
         except:
             return text
 
@@ -1196,11 +1728,18 @@ def collect_all_responses(history, current_message):
     responses.append(current_message)
     return responses
 
-def generate_comprehensive_diagnosis(responses, category, age, gender):
-    """Generate final diagnosis with percentages"""
+def build_diagnosis_prompt(responses, category, age, gender, language=None):
+    """Gemini prompt for the final structured diagnosis (optionally written in the user's language)"""
     responses_text = " | ".join(responses)
     
-    prompt = f"""Based on medical assessment:
+    language_rule = ""
+    if language and language != 'English':
+        language_rule = f"""
+    
+    Write the whole diagnosis (headings, condition names, severity, steps and tips) in {language}.
+    Keep every emoji, the ** markers, the 1. 2. 3. numbering, the % numbers and the • bullets exactly as shown."""
+    
+    return f"""Based on medical assessment:
     Patient: {age}yr {gender}
     Category: {category}
     Responses: {responses_text}
@@ -1222,14 +1761,12 @@ def generate_comprehensive_diagnosis(responses, category, age, gender):
     • [Tip 1]
     • [Tip 2]
     
-    Use realistic percentages. Be specific with condition names."""
-    
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except:
-        category_display = category.replace('_', ' ').title()
-        return f"""🔍 **Top 3 Possible Conditions:**
+    Use realistic percentages. Be specific with condition names.{language_rule}"""
+
+def fallback_diagnosis(category):
+    """Template diagnosis used when Gemini is unavailable"""
+    category_display = category.replace('_', ' ').title()
+    return f"""🔍 **Top 3 Possible Conditions:**
 1. Common {category_display} condition - 60% likelihood
 2. Moderate related disorder - 25% likelihood
 3. Less common alternative - 15% likelihood
@@ -1246,258 +1783,397 @@ def generate_comprehensive_diagnosis(responses, category, age, gender):
 
 ⚠️ This is not professional medical advice. Consult a doctor for proper diagnosis and treatment."""
 
-# FIXED: Main processing function with proper parameter handling and translation
-def process_complete_medical_query(message, history, age, gender, language, patient_name):
-    """COMPLETE medical processing with FIXED translation and input handling"""
-    global conversation_data
+# Structure every diagnosis must have, whatever language it is written in
+DIAGNOSIS_SECTION_MARKERS = ('🔍', '⚠️', '📋', '💡')
+DIAGNOSIS_CONDITION_LINE = re.compile(r'^\s*[1-3][.)]\s+\S.*\d{1,3}\s*%', re.MULTILINE)
+
+def validate_diagnosis_format(diagnosis, language=None):
+    """Check a (possibly localized) diagnosis against the EXACT output format"""
+    if not diagnosis or not all(marker in diagnosis for marker in DIAGNOSIS_SECTION_MARKERS):
+        return False
+    if len(DIAGNOSIS_CONDITION_LINE.findall(diagnosis)) < 3 or diagnosis.count('•') < 2:
+        return False
+    if LANGUAGES.get(language, 'en') != 'en':
+        # Every other supported language uses a non-Latin script
+        letters = [char for char in diagnosis if char.isalpha()]
+        native = sum(1 for char in letters if ord(char) > 0x024F)
+        if not letters or native / len(letters) < 0.5:
+            return False
+    return True
+
+def generate_comprehensive_diagnosis(responses, category, age, gender, language=None):
+    """Generate final diagnosis with percentages"""
+    try:
+        response = gemini_generate(build_diagnosis_prompt(responses, category, age, gender, language))
+        return response.text.strip()
+    except:
+        return fallback_diagnosis(category)
+
+async def generate_comprehensive_diagnosis_async(responses, category, age, gender, language=None):
+    """Async variant of generate_comprehensive_diagnosis"""
+    try:
+        response = await gemini_generate_async(build_diagnosis_prompt(responses, category, age, gender, language))
+        return response.text.strip()
+    except:
+        return fallback_diagnosis(category)
+
+async def stream_comprehensive_diagnosis_async(responses, category, age, gender, language=None):
+    """Yield diagnosis text chunks as Gemini produces them"""
+    streamed_any = False
+    try:
+        response = await gemini_gateway.call_async(
+            get_gemini_model().generate_content_async, build_diagnosis_prompt(responses, category, age, gender, language), stream=True
+        )
+        async for chunk in response:
+            text = chunk.text
+            if text:
+                streamed_any = True
+                yield text
+    except Exception as e:
+        print(f"Diagnosis stream failed: {e}")
+        # A partial answer is kept; only an empty one falls back to the template
+        if not streamed_any:
+            yield fallback_diagnosis(category)
+
+def is_memoizable_diagnosis(diagnosis, category, language=None):
+    """Only complete Gemini answers are memoized - never the template fallback"""
+    diagnosis = diagnosis.strip()
+    return diagnosis != fallback_diagnosis(category).strip() and validate_diagnosis_format(diagnosis, language)
+
+async def stream_translated_lines(chunks, language, translate_line):
+    """Yield (display_text, english_text) while diagnosis chunks arrive.
+
+    English is shown as it streams. For other languages every completed line
+    is handed to translate_line as soon as it ends (translate_diagnosis_line:
+    the segmented translator's bounded pool, with per-segment retries and
+    fallback) and shown in order.
+    """
+    english = ''
+    if not language or language == 'English':
+        async for chunk in chunks:
+            english += chunk
+            yield english, english
+        return
     
+    partial_line = ''
+    line_tasks = []
+    shown = []
+    async for chunk in chunks:
+        english += chunk
+        *completed, partial_line = (partial_line + chunk).split('\n')
+        for line in completed:
+            line_tasks.append(asyncio.ensure_future(translate_line(line, language)))
+        ready = len(shown)
+        while len(shown) < len(line_tasks) and line_tasks[len(shown)].done():
+            shown.append(line_tasks[len(shown)].result())
+        if len(shown) > ready:
+            yield '\n'.join(shown), english
+    
+    if partial_line:
+        line_tasks.append(asyncio.ensure_future(translate_line(partial_line, language)))
+    for task in line_tasks[len(shown):]:
+        shown.append(await task)
+        yield '\n'.join(shown), english
+
+# Blocking upstream calls of the sync shim. Not the loop's default executor, so
+# asyncio.run() doesn't wait for a call the turn budget already gave up on.
+@functools.lru_cache(maxsize=None)
+def get_blocking_pool():
+    return ThreadPoolExecutor(max_workers=int(os.getenv('BLOCKING_UPSTREAM_WORKERS', '8')),
+                              thread_name_prefix='blocking-upstream')
+
+def _as_coroutine(fn):
+    """Wrap a blocking function so the shared async turn logic can await it.
+
+    It runs on a worker thread so the turn budget can stop waiting for it.
+    """
+    async def call(*args):
+        return await asyncio.get_running_loop().run_in_executor(get_blocking_pool(), functools.partial(fn, *args))
+    return call
+
+def _as_single_chunk_stream(fn):
+    """Wrap a blocking function as an async stream with one chunk"""
+    async def stream(*args):
+        yield await _as_coroutine(fn)(*args)
+    return stream
+
+# Upstream calls used by a chat turn: native async, or blocking ones for the sync shim
+Upstream = namedtuple('Upstream', ['detect', 'diagnose_stream', 'translate', 'translate_line'])
+async_upstream = Upstream(
+    ai_smart_symptom_detection_async,
+    stream_comprehensive_diagnosis_async,
+    translate_to_user_language_async,
+    translate_diagnosis_line_async
+)
+blocking_upstream = Upstream(
+    _as_coroutine(ai_smart_symptom_detection),
+    _as_single_chunk_stream(generate_comprehensive_diagnosis),
+    _as_coroutine(translate_to_user_language),
+    _as_coroutine(translate_diagnosis_line)
+)
+
+def with_turn_budget(upstream, budget):
+    """Upstream whose calls share the turn's deadline and fall back locally when it runs out.
+
+    Detection falls back to "no category", translation to a cached
+    translation or the English text, and the diagnosis to the template.
+    """
+    async def detect(text, detected_lang):
+        return await budget.run('symptom detection', upstream.detect(text, detected_lang), lambda: (text, None, 0))
+
+    async def translate(text, language):
+        def offline():
+            return lookup_translation(text, LANGUAGES.get(language, 'en')) or text
+        return await budget.run('translation', upstream.translate(text, language), offline)
+
+    async def translate_line(line, language):
+        def offline():
+            return lookup_translation(line, LANGUAGES.get(language, 'en')) or line
+        return await budget.run('translation', upstream.translate_line(line, language), offline)
+
+    def diagnose_stream(responses, category, age, gender, language=None):
+        return budget.stream('diagnosis', upstream.diagnose_stream(responses, category, age, gender, language),
+                             lambda: fallback_diagnosis(category))
+
+    return Upstream(detect, diagnose_stream, translate, translate_line)
+
+def add_degraded_notice(response, language):
+    """Say that a fallback was used, keeping any CATEGORY marker last"""
+    notice = DEGRADED_NOTICE
+    if language and language != 'English':
+        notice = lookup_translation(notice, LANGUAGES.get(language, 'en')) or notice
+    if CATEGORY_MARKER in response:
+        visible, marker = response.split(CATEGORY_MARKER, 1)
+        return f"{visible.rstrip()}\n\n{notice}\n\n{CATEGORY_MARKER}{marker}"
+    return f"{response}\n\n{notice}"
+
+def record_assessment(session, category):
+    """Append the finished assessment (the report's fields) to the assessment log"""
+    if assessment_log is None:
+        return
+    assessment_log.append({
+        'patient_name': session.get('patient_name', 'Patient'),
+        'age': session.get('age', 25),
+        'gender': session.get('gender', 'Male'),
+        'language': session.get('language', 'English'),
+        'category': category,
+        'diagnosis': session['diagnosis']
+    })
+
+def get_session_id(request=None):
+    """Gradio session hash, or a shared id for direct (non-UI) callers"""
+    return getattr(request, 'session_hash', None) or DEFAULT_SESSION_ID
+
+def get_conversation_state(session, history):
+    """Resume the session's state when it matches history, else rebuild it in one pass"""
+    state = session.get('state')
+    if state is None or not state.matches(history):
+        state = session['state'] = ConversationState.from_history(history, SYMPTOM_QUESTIONS)
+    return state
+
+async def stream_medical_turn(message, history, age, gender, language, patient_name, request, upstream):
+    """One chat turn: load session state, stream the answer, record the exchange"""
+    session_id = get_session_id(request)
+    session = session_store.get_or_create(session_id)
+    state = get_conversation_state(session, history)
+    budget = TurnBudget(TURN_BUDGET_SECONDS)
+    response = ''
+    async for response in answer_medical_query(message, history, age, gender, language, patient_name, state, session,
+                                               with_turn_budget(upstream, budget)):
+        yield response
+    if budget.degraded:
+        print(f"DEBUG: Degraded turn ({', '.join(budget.degraded)})")
+        response = add_degraded_notice(response, language)
+        yield response
+    # The UI appends exactly the final reply to history, so keep the state in step
+    state.record_turn(message, response)
+    session_store.put(session_id, session)
+
+async def process_complete_medical_query_async(message, history, age, gender, language, patient_name, request=None):
+    """Streaming async chat handler - yields the reply as it grows"""
+    async for response in stream_medical_turn(message, history, age, gender, language, patient_name, request, async_upstream):
+        yield response
+
+async def _final_reply(stream):
+    response = ''
+    async for response in stream:
+        pass
+    return response
+
+# FIXED: Main processing function with proper parameter handling and translation
+def process_complete_medical_query(message, history, age, gender, language, patient_name, request=None):
+    """COMPLETE medical processing with FIXED translation and input handling.
+
+    Synchronous shim for existing callers: returns the final reply. Must not
+    be called from a running event loop.
+    """
+    return asyncio.run(_final_reply(
+        stream_medical_turn(message, history, age, gender, language, patient_name, request, blocking_upstream)
+    ))
+
+async def answer_medical_query(message, history, age, gender, language, patient_name, state, session, upstream):
+    """Yield the reply for one turn (progressively for the diagnosis)"""
     # DEBUG: Print all received parameters
     print(f"DEBUG: message='{message}', age={age}, gender='{gender}', language='{language}', patient_name='{patient_name}'")
     
     # Store conversation data for report (with actual values)
-    conversation_data = {
+    session.update({
         'patient_name': patient_name if patient_name and patient_name.strip() else f"Patient_{datetime.now().strftime('%Y%m%d')}",
         'age': age if age is not None else 25,
         'gender': gender if gender else 'Male',
         'language': language if language else 'English',
-        'history': history if history else [],
         'current_message': message if message else ''
-    }
+    })
+    if not history:
+        # New conversation - don't report a previous assessment
+        session.pop('diagnosis', None)
     
     if not message:
-        welcome_msg = "Please describe your symptoms to get started."
+        welcome_msg = WELCOME_PROMPT
         if language and language != 'English':
-            welcome_msg = translate_to_user_language(welcome_msg, language)
-        return welcome_msg
+            welcome_msg = await upstream.translate(welcome_msg, language)
+        yield welcome_msg
+        return
     
     message = str(message).strip()
     
-    # Detect language from text
-    detected_lang = detect_language_from_script(message)
+    # Detect language from text (one pass; session language breaks shared-script ties)
+    session_lang_code = LANGUAGES.get(language, 'en')
+    detection = detect_language(message, preferred=session_lang_code)
+    detected_lang = detection.language
+    # Typed natively in the session language - the user's own words need no translation
+    input_in_session_language = detected_lang == session_lang_code and not detection.romanized
+    print(f"DEBUG: Detected language '{detected_lang}' (romanized={detection.romanized})")
     
     # Handle greetings
     if is_greeting_universal(message):
-        response = f"👋 Hello! I'm your Smart Symptom Checker. Please describe your symptoms in detail."
+        response = GREETING_REPLY
         if language and language != 'English':
-            response = translate_to_user_language(response, language)
-        return response
+            response = await upstream.translate(response, language)
+        yield response
+        return
     
     # Get conversation state
-    questions_asked = count_questions_in_history(history)
-    had_ack = has_symptom_acknowledgment(history)
-    stored_category = extract_stored_category(history)
-    all_responses = collect_all_responses(history, message)
+    questions_asked = state.questions_asked
+    had_ack = state.acknowledged
+    stored_category = state.category
     
     print(f"DEBUG: Questions: {questions_asked}, Had ack: {had_ack}, Category: {stored_category}")
     
     # Validate input (very lenient)
     if not is_valid_response(message) and not stored_category and questions_asked == 0:
-        response = "🤔 Please describe your symptoms or health concerns in more detail."
+        response = MORE_DETAIL_PROMPT
         if language and language != 'English':
-            response = translate_to_user_language(response, language)
-        return response
+            response = await upstream.translate(response, language)
+        yield response
+        return
     
     # Initial symptom detection and acknowledgment
     if not stored_category and not had_ack:
-        translation, symptom_category, confidence = ai_smart_symptom_detection(message, detected_lang)
+        translation, symptom_category, confidence = await upstream.detect(message, detected_lang)
         
         if symptom_category and confidence >= 6:
-            response = f"I understand you're experiencing: {message}\n\nLet me ask some targeted questions to help assess your condition.\n\nCATEGORY:{symptom_category}"
+            response = f"{ACK_LEAD_IN} {message}\n\n{ACK_FOLLOW_UP}\n\nCATEGORY:{symptom_category}"
             
-            if language and language != 'English':
-                visible_part = f"I understand you're experiencing: {message}\n\nLet me ask some targeted questions to help assess your condition."
-                translated = translate_to_user_language(visible_part, language)
+            if language and language != 'English' and input_in_session_language:
+                # Translate only the fixed (cacheable) parts and keep the user's words as typed
+                lead_in = await upstream.translate(ACK_LEAD_IN, language)
+                follow_up = await upstream.translate(ACK_FOLLOW_UP, language)
+                response = f"{lead_in} {message}\n\n{follow_up}\n\nCATEGORY:{symptom_category}"
+            elif language and language != 'English':
+                visible_part = f"{ACK_LEAD_IN} {message}\n\n{ACK_FOLLOW_UP}"
+                translated = await upstream.translate(visible_part, language)
                 response = f"{translated}\n\nCATEGORY:{symptom_category}"
             
-            return response
+            yield response
+            return
         else:
-            response = "I understand your health concern. Let me ask some questions to help assess your condition."
+            response = GENERIC_ACK
             if language and language != 'English':
-                response = translate_to_user_language(response, language)
-            return response
-    
-    # Get category from history if not available
-    if not stored_category:
-        stored_category = extract_stored_category(history)
+                response = await upstream.translate(response, language)
+            yield response
+            return
     
     # Ask targeted questions (up to 5)
     if stored_category and questions_asked < 5:
         question = SYMPTOM_QUESTIONS[stored_category][questions_asked]
         
         if language and language != 'English':
-            question = translate_to_user_language(question, language)
+            question = await upstream.translate(question, language)
         
-        return question
+        yield question
+        return
     
     # Generate comprehensive diagnosis after 5 questions
     elif questions_asked >= 5 and stored_category:
-        diagnosis = generate_comprehensive_diagnosis(all_responses, stored_category, age, gender)
+        all_responses = state.responses + [message]
+        # The memo is keyed on the answers to the five questions
+        answers = all_responses[-5:]
         
-        # Store diagnosis for report
-        conversation_data['diagnosis'] = diagnosis
+        if LOCALIZED_DIAGNOSIS and language and language != 'English':
+            memoized = diagnosis_memo.get(stored_category, answers, age, gender, language) if diagnosis_memo else None
+            if memoized:
+                print(f"DEBUG: Diagnosis memo hit ({language})")
+                session['diagnosis'] = memoized
+                record_assessment(session, stored_category)
+                yield memoized
+                return
+            localized = ''
+            async for chunk in upstream.diagnose_stream(all_responses, stored_category, age, gender, language):
+                localized += chunk
+                yield localized
+            if validate_diagnosis_format(localized, language):
+                session['diagnosis'] = localized.strip()
+                record_assessment(session, stored_category)
+                if diagnosis_memo and is_memoizable_diagnosis(localized, stored_category, language):
+                    diagnosis_memo.put(stored_category, answers, age, gender, session['diagnosis'], language)
+                return
+            # The final two-step yield replaces the rejected text in the chat
+            print(f"DEBUG: Localized diagnosis failed validation for {language}, using two-step path")
         
-        if language and language != 'English':
-            diagnosis = translate_to_user_language(diagnosis, language)
+        memoized = diagnosis_memo.get(stored_category, answers, age, gender) if diagnosis_memo else None
+        if memoized:
+            print("DEBUG: Diagnosis memo hit")
+            chunks = _as_single_chunk_stream(lambda: memoized)()
+        else:
+            chunks = upstream.diagnose_stream(all_responses, stored_category, age, gender)
+        
+        diagnosis = ''
+        async for shown, diagnosis in stream_translated_lines(chunks, language, upstream.translate_line):
+            yield shown
         
-        return diagnosis
+        # Store diagnosis for report
+        session['diagnosis'] = diagnosis.strip()
+        record_assessment(session, stored_category)
+        if diagnosis_memo and not memoized and is_memoizable_diagnosis(diagnosis, stored_category):
+            diagnosis_memo.put(stored_category, answers, age, gender, session['diagnosis'])
     
     # Default fallback
     else:
-        response = "Please describe your main symptom so I can help assess your condition."
+        response = MAIN_SYMPTOM_PROMPT
         if language and language != 'English':
-            response = translate_to_user_language(response, language)
-        return response
+            response = await upstream.translate(response, language)
+        yield response
 
-# SIMPLIFIED REPORT GENERATION (keeping the working version)
-def create_bulletproof_report(name, age, gender, language, diagnosis):
-    """Create a report that ALWAYS works"""
-    try:
-        from fpdf import FPDF
-        return create_fpdf2_report(name, age, gender, language, diagnosis)
-    except ImportError:
-        print("DEBUG: fpdf2 not available, trying text report...")
-    except Exception as e:
-        print(f"DEBUG: fpdf2 failed: {e}")
-    
-    try:
-        return create_text_report(name, age, gender, language, diagnosis)
-    except Exception as e:
-        print(f"DEBUG: Text report failed: {e}")
-        return None
-
-def create_fpdf2_report(name, age, gender, language, diagnosis):
-    """Create PDF using fpdf2"""
-    from fpdf import FPDF
-    
-    pdf = FPDF(orientation='P', unit='mm', format='A4')
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    
-    # Header
-    pdf.set_fill_color(70, 130, 180)
-    pdf.rect(0, 0, 210, 30, 'F')
-    
-    pdf.set_font('Arial', 'B', 18)
-    pdf.set_text_color(255, 255, 255)
-    pdf.set_xy(10, 8)
-    pdf.cell(0, 10, 'MedMind AI - Medical Assessment Report', 0, 1, 'C')
-    
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_y(35)
-    
-    # Patient Information
-    pdf.set_font('Arial', 'B', 14)
-    pdf.cell(0, 10, 'Patient Information', 0, 1, 'L')
-    pdf.ln(5)
-    
-    pdf.set_font('Arial', '', 11)
-    patient_info = [
-        f'Name: {name}',
-        f'Age: {age} years',
-        f'Gender: {gender}',
-        f'Language: {language}',
-        f'Assessment Date: {datetime.now().strftime("%B %d, %Y")}'
-    ]
-    
-    for info in patient_info:
-        pdf.cell(0, 7, info, 0, 1, 'L')
-    pdf.ln(8)
-    
-    # Medical Assessment
-    pdf.set_font('Arial', 'B', 14)
-    pdf.cell(0, 10, 'Medical Assessment Results', 0, 1, 'L')
-    pdf.ln(5)
-    
-    pdf.set_font('Arial', '', 10)
-    
-    if diagnosis and len(diagnosis.strip()) > 10:
-        lines = diagnosis.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line:
-                try:
-                    clean_line = line.encode('latin-1', errors='ignore').decode('latin-1')
-                    pdf.cell(0, 6, clean_line[:85], 0, 1, 'L')
-                except:
-                    safe_line = ''.join(c for c in line if ord(c) < 128)
-                    pdf.cell(0, 6, safe_line[:85], 0, 1, 'L')
-                pdf.ln(1)
-    else:
-        pdf.cell(0, 7, 'Assessment: Please complete your medical evaluation for detailed results.', 0, 1, 'L')
-    
-    pdf.ln(15)
-    
-    # Disclaimer
-    pdf.set_font('Arial', 'B', 12)
-    pdf.set_text_color(220, 53, 69)
-    pdf.cell(0, 8, 'IMPORTANT MEDICAL DISCLAIMER', 0, 1, 'C')
-    pdf.ln(5)
-    
-    pdf.set_font('Arial', '', 10)
-    pdf.set_text_color(0, 0, 0)
-    disclaimer_text = [
-        'This report is generated by MedMind AI for educational purposes only.',
-        'It is NOT a substitute for professional medical advice, diagnosis, or treatment.',
-        'Always consult with qualified healthcare professionals for medical concerns.'
-    ]
-    
-    for text in disclaimer_text:
-        pdf.cell(0, 6, text, 0, 1, 'C')
-    
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    try:
-        pdf.output(temp_file.name)
-        return temp_file.name
-    except Exception as e:
-        print(f"PDF output failed: {e}")
-        temp_file.close()
-        os.unlink(temp_file.name)
-        return None
-
-def create_text_report(name, age, gender, language, diagnosis):
-    """Create text report as fallback"""
-    try:
-        content = f"""
-MEDMIND AI - MEDICAL ASSESSMENT REPORT
-====================================
-
-PATIENT INFORMATION:
--------------------
-Name: {name}
-Age: {age} years
-Gender: {gender}
-Language: {language}
-Assessment Date: {datetime.now().strftime("%B %d, %Y")}
-Report Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
-
-MEDICAL ASSESSMENT RESULTS:
---------------------------
-{diagnosis if diagnosis else 'Please complete your medical assessment in the chat for detailed results.'}
-
-IMPORTANT MEDICAL DISCLAIMER:
-----------------------------
-This report is generated by MedMind AI for educational purposes only.
-It is NOT a substitute for professional medical advice, diagnosis, or treatment.
-Always consult with qualified healthcare professionals for medical concerns.
-In case of medical emergency, contact your local emergency services immediately.
-
-MedMind AI - Your Digital Health Assistant
-Report ID: TXT-{datetime.now().strftime("%Y%m%d%H%M%S")}
-"""
-        
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
-        
-        return temp_file.name
-        
-    except Exception as e:
-        print(f"Text report creation failed: {e}")
-        return None
+def get_runtime_stats():
+    """Counters of the in-process caches, pools and stores (served to admins by main.py)"""
+    return {
+        'symptom_detection_cache': symptom_detection_cache.stats(),
+        'diagnosis_memo': diagnosis_memo.stats() if diagnosis_memo else 'disabled (set DIAGNOSIS_MEMO=1)',
+        'translation_cache': get_translation_cache().stats(),
+        'segmented_translation': get_segmented_translator().stats(),
+        'sessions': session_store.stats(),
+        'single_flight': upstream_flights.stats(),
+        'gemini_gateway': gemini_gateway.stats(),
+        'report_pool': report_pool.stats(),
+        'assessment_log': assessment_log.stats() if assessment_log else 'disabled (set ASSESSMENT_LOG_PATH)',
+        'report_store': memory_reports.stats() if memory_reports is not None else get_report_store().stats()
+    }
 
-def generate_report_file():
-    """Generate report with actual patient data"""
-    global conversation_data
+# SIMPLIFIED REPORT GENERATION (keeping the working version)
+def report_arguments(session_id=DEFAULT_SESSION_ID):
+    """(name, age, gender, language, diagnosis) for the session's report"""
+    conversation_data = session_store.get(session_id)
     
     if not conversation_data:
         conversation_data = {
@@ -1508,44 +2184,142 @@ def generate_report_file():
             'diagnosis': 'Demo assessment - Complete your medical chat for detailed results.'
         }
     
-    try:
-        report_path = create_bulletproof_report(
-            name=conversation_data.get('patient_name', 'Patient'),
-            age=conversation_data.get('age', 25),
-            gender=conversation_data.get('gender', 'Male'),
-            language=conversation_data.get('language', 'English'),
-            diagnosis=conversation_data.get('diagnosis', 'Assessment in progress')
-        )
-        
+    return (
+        conversation_data.get('patient_name', 'Patient'),
+        conversation_data.get('age', 25),
+        conversation_data.get('gender', 'Male'),
+        conversation_data.get('language', 'English'),
+        conversation_data.get('diagnosis', 'Assessment in progress')
+    )
+
+def stored_report_key(arguments):
+    """Store key for report_arguments(); reports show today's date, so it is part of the key"""
+    return report_key(*arguments, datetime.now().strftime('%Y-%m-%d'))
+
+def generate_report_file(session_id=DEFAULT_SESSION_ID):
+    """Generate report with actual patient data"""
+    arguments = report_arguments(session_id)
+    key = stored_report_key(arguments)
+    store = get_report_store()
+    report_path = store.get(key)
+    if report_path:
         return report_path
-        
+    
+    try:
+        rendered = create_bulletproof_report(*arguments, store.staging_stem())
+        return store.put(key, rendered) if rendered else None
     except Exception as e:
         print(f"Report generation failed: {e}")
         return None
 
-def handle_report_generation():
-    """Handle report generation"""
+async def _render_and_store(key, arguments):
+    store = get_report_store()
+    rendered, timings = await report_pool.render_async(create_bulletproof_report, *arguments, store.staging_stem())
+    print(f"DEBUG: Report queue wait {timings['queue_wait']}s, render {timings['render']}s")
+    return (store.put(key, rendered) if rendered else None), timings
+
+async def generate_report_file_async(session_id=DEFAULT_SESSION_ID):
+    """Stored or freshly rendered report for the session: (path, timings); raises ReportQueueFull"""
+    arguments = report_arguments(session_id)
+    key = stored_report_key(arguments)
+    report_path = get_report_store().get(key)
+    if report_path:
+        return report_path, {'queue_wait': 0.0, 'render': 0.0}
+    # Double clicks on the same report share one render
+    return await upstream_flights.do_async(fingerprint('report', key), _render_and_store, key, arguments)
+
+async def _render_to_memory(key, arguments):
+    rendered, timings = await report_pool.render_async(render_report_bytes, *arguments)
+    print(f"DEBUG: Report queue wait {timings['queue_wait']}s, render {timings['render']}s")
+    if rendered:
+        memory_reports.put(key, *rendered)
+    return rendered, timings
+
+async def generate_report_bytes_async(session_id=DEFAULT_SESSION_ID):
+    """In-memory variant of generate_report_file_async: (key, (data, suffix) or None, timings)"""
+    arguments = report_arguments(session_id)
+    key = stored_report_key(arguments)
+    report = memory_reports.get(key)
+    if report:
+        return key, report, {'queue_wait': 0.0, 'render': 0.0}
+    rendered, timings = await upstream_flights.do_async(fingerprint('report', key), _render_to_memory, key, arguments)
+    return key, rendered, timings
+
+def report_download_link(key, suffix):
+    file_type = "PDF" if suffix == '.pdf' else "Text"
+    return (f'<a href="{REPORT_DOWNLOAD_PATH}/{key}" download="medmind_report{suffix}" '
+            f'style="font-weight: 600;">📥 Download {file_type} report</a>')
+
+def report_download_response(key):
+    """Streams an in-memory report (served by main.py); 404 once it has been evicted"""
+    from starlette.responses import Response, StreamingResponse
+    
+    report = memory_reports.get(key) if memory_reports is not None else None
+    if report is None:
+        return Response(status_code=404)
+    data, suffix = report
+    view = memoryview(data)
+    return StreamingResponse(
+        (view[start:start + REPORT_CHUNK_BYTES] for start in range(0, len(data), REPORT_CHUNK_BYTES)),
+        media_type=REPORT_MIMETYPES.get(suffix, 'application/octet-stream'),
+        headers={
+            'Content-Length': str(len(data)),
+            'Content-Disposition': f'attachment; filename="medmind_report{suffix}"',
+            'Cache-Control': 'private, no-store'
+        }
+    )
+
+async def handle_report_generation(request=None):
+    """Handle report generation (shows a pending state until the file is ready)"""
+    import gradio as gr
+    
+    yield (
+        gr.File(visible=False),
+        "⏳ Generating your report...",
+        gr.HTML(visible=False)
+    )
+    
     try:
-        report_path = generate_report_file()
-        
-        if report_path and os.path.exists(report_path):
-            file_size = os.path.getsize(report_path)
-            file_type = "PDF" if report_path.endswith('.pdf') else "Text"
-            
-            return (
-                gr.File(value=report_path, visible=True),
-                f"✅ {file_type} report generated successfully! ({file_size} bytes) Click to download."
-            )
+        if memory_reports is not None:
+            key, report, _ = await generate_report_bytes_async(get_session_id(request))
+            if report:
+                data, suffix = report
+                file_type = "PDF" if suffix == '.pdf' else "Text"
+                yield (
+                    gr.File(visible=False),
+                    f"✅ {file_type} report generated successfully! ({len(data)} bytes) Click to download.",
+                    gr.HTML(value=report_download_link(key, suffix), visible=True)
+                )
+                return
         else:
-            return (
-                gr.File(visible=False),
-                "❌ Report generation failed. Please try again."
-            )
-                
+            report_path, _ = await generate_report_file_async(get_session_id(request))
+            if report_path and os.path.exists(report_path):
+                file_size = os.path.getsize(report_path)
+                file_type = "PDF" if report_path.endswith('.pdf') else "Text"
+                yield (
+                    gr.File(value=report_path, visible=True),
+                    f"✅ {file_type} report generated successfully! ({file_size} bytes) Click to download.",
+                    gr.HTML(visible=False)
+                )
+                return
+        
+        yield (
+            gr.File(visible=False),
+            "❌ Report generation failed. Please try again.",
+            gr.HTML(visible=False)
+        )
+    
+    except ReportQueueFull:
+        yield (
+            gr.File(visible=False),
+            "⏳ Many reports are being generated right now. Please try again in a moment.",
+            gr.HTML(visible=False)
+        )
     except Exception as e:
-        return (
+        yield (
             gr.File(visible=False),
-            f"❌ Error: {str(e)}"
+            f"❌ Error: {str(e)}",
+            gr.HTML(visible=False)
         )
 
 # Enhanced CSS
@@ -1631,8 +2405,21 @@ complete_css = """
 
 def create_complete_medmind_app():
     """Create COMPLETE working MedMind AI with FIXED inputs and translation"""
+    # Gradio is only imported when the UI is actually served
+    import gradio as gr
+    
+    # Gradio passes the session to parameters annotated with gr.Request
+    async def chat_handler(message, history, age, gender, language, patient_name, request: gr.Request = None):
+        async for response in process_complete_medical_query_async(message, history, age, gender, language, patient_name, request):
+            yield response
     
-    with gr.Blocks(css=complete_css, title="🩺 MedMind AI - All Features Working") as app:
+    async def report_handler(request: gr.Request = None):
+        async for update in handle_report_generation(request):
+            yield update
+    
+    # delete_cache: Gradio's own copies of served report files expire like the report store
+    with gr.Blocks(css=complete_css, title="🩺 MedMind AI - All Features Working",
+                   delete_cache=(3600, REPORT_TTL_SECONDS)) as app:
         
         # Header
         gr.HTML("""
@@ -1717,6 +2504,8 @@ def create_complete_medmind_app():
                     file_types=[".pdf", ".txt"]
                 )
                 
+                report_link = gr.HTML(visible=False)
+                
                 generate_report_btn = gr.Button(
                     "📋 Generate Medical Report", 
                     variant="primary",
@@ -1730,8 +2519,9 @@ def create_complete_medmind_app():
                 )
                 
                 generate_report_btn.click(
-                    fn=handle_report_generation,
-                    outputs=[report_file, status_msg]
+                    fn=report_handler,
+                    outputs=[report_file, status_msg, report_link],
+                    api_name="handle_report_generation"
                 )
 
             # Chat interface - FIXED with correct examples format
@@ -1749,7 +2539,7 @@ def create_complete_medmind_app():
                 
                 # FIXED ChatInterface with properly formatted examples for additional_inputs
                 chatbot = gr.ChatInterface(
-                    process_complete_medical_query,
+                    chat_handler,
                     additional_inputs=[age_input, gender_input, language_input, patient_name_input],
                     examples=[
                         # FIXED FORMAT: [message, age, gender, language, patient_name]
@@ -1795,8 +2585,11 @@ if __name__ == "__main__":
     print("   🤖 AI symptom detection - WORKING")
     print("   📋 PDF report generation - WORKING")
     print("   💾 Download functionality - WORKING")
+    if REPORT_IN_MEMORY:
+        print("⚠️ REPORT_IN_MEMORY downloads are served by main.py's server, not by this launcher")
     
     # Create and launch
+    start_question_bank_build()
     working_app = create_complete_medmind_app()
     
     print("\n🎉 MedMind AI with ALL FIXED features is ready!")
@@ -0,0 +1,86 @@
+import datetime
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+
+class AssessmentLog:
+    """Daily JSON Lines files of completed assessments.
+
+    One line per finished diagnosis with the fields bulk_export.py reads
+    (id, patient_name, age, gender, language, diagnosis) plus the category
+    and completion time. Lines go to '<name>-YYYY-MM-DD<ext>' next to path,
+    one file per day, and files older than retention_days are deleted.
+
+    The files hold personal data (names, ages, diagnoses), so they are
+    created readable by the owner only.
+    """
+
+    def __init__(self, path, retention_days=7):
+        self.directory = os.path.dirname(path) or '.'
+        self.prefix, self.suffix = os.path.splitext(os.path.basename(path))
+        self.retention_days = retention_days
+        self._day_pattern = re.compile(
+            re.escape(self.prefix) + r'-(\d{4}-\d{2}-\d{2})' + re.escape(self.suffix) + '$'
+        )
+        self._current_day = None
+        self._lock = threading.Lock()
+        self.counters = {
+            'written': 0,
+            'failed': 0,
+            'expired_files': 0
+        }
+
+    def path_for(self, day):
+        """File holding the assessments completed on day (a datetime.date)"""
+        return os.path.join(self.directory, f"{self.prefix}-{day.isoformat()}{self.suffix}")
+
+    def _expire(self, today):
+        """Delete daily files older than retention_days"""
+        cutoff = today - datetime.timedelta(days=self.retention_days)
+        for name in os.listdir(self.directory):
+            match = self._day_pattern.match(name)
+            if not match:
+                continue
+            try:
+                day = datetime.date.fromisoformat(match.group(1))
+            except ValueError:
+                continue
+            if day < cutoff:
+                os.unlink(os.path.join(self.directory, name))
+                self.counters['expired_files'] += 1
+
+    def append(self, assessment):
+        record = {
+            'id': uuid.uuid4().hex,
+            'completed_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            **assessment
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        today = datetime.date.today()
+        with self._lock:
+            try:
+                if today != self._current_day:
+                    # First write of the day: rotate, and drop files past retention
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._expire(today)
+                    self._current_day = today
+                fd = os.open(self.path_for(today), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                with os.fdopen(fd, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self.counters['written'] += 1
+            except OSError as e:
+                print(f"Assessment log write failed ({self.path_for(today)}): {e}")
+                self.counters['failed'] += 1
+                return None
+        return record['id']
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['current_file'] = self.path_for(datetime.date.today())
+        stats['retention_days'] = self.retention_days
+        return stats
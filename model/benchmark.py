@@ -0,0 +1,385 @@
+"""MedMind performance benchmarks.
+
+Run from model/:
+    python benchmark.py conversation-state
+    python benchmark.py classification-prompts [--live]
+    python benchmark.py local-classifier [--min-precision 0.95]
+    python benchmark.py import-time [--max-ms 400]
+    python benchmark.py report-render [--max-ratio 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def _synthetic_history(length):
+    """Tuples-format history: ack with category marker, then question/answer turns"""
+    history = [["I have stomach pain",
+                "I understand you're experiencing: I have stomach pain\n\nCATEGORY:stomach_pain"]]
+    while len(history) < length:
+        history.append(["It is a dull pain since yesterday", "Does eating make it better or worse?"])
+    return history[:length]
+
+
+def bench_conversation_state(lengths=(10, 100, 1000, 5000), repeat=200):
+    """Per-turn state cost: four legacy history scans vs. the incremental state"""
+    from app import (count_questions_in_history, has_symptom_acknowledgment,
+                     extract_stored_category, collect_all_responses, get_conversation_state)
+
+    print(f"{'history':>8} {'legacy scans':>14} {'incremental':>13} {'rebuild':>10}")
+    for length in lengths:
+        history = _synthetic_history(length)
+        message = "Yes, a little nausea"
+
+        def legacy_turn():
+            count_questions_in_history(history)
+            has_symptom_acknowledgment(history)
+            extract_stored_category(history)
+            extract_stored_category(history)
+            collect_all_responses(history, message)
+
+        # Prime the session once (the one-pass rebuild), then time steady-state turns
+        rebuild = _time_per_call(lambda: get_conversation_state({}, history), max(1, repeat // 20))
+        session = {}
+        get_conversation_state(session, history)
+
+        def incremental_turn():
+            state = get_conversation_state(session, history)
+            state.questions_asked, state.acknowledged, state.category
+
+        legacy = _time_per_call(legacy_turn, repeat)
+        incremental = _time_per_call(incremental_turn, repeat)
+        print(f"{length:>8} {legacy * 1e6:>12.1f}us {incremental * 1e6:>11.1f}us {rebuild * 1e6:>8.1f}us")
+
+
+# Labeled complaints for classification accuracy (deliberately not all local-classifier hits)
+CLASSIFICATION_SAMPLES = [
+    ("My tummy has been hurting since lunch", 'stomach_pain'),
+    ("I keep throwing up everything I eat", 'vomiting'),
+    ("There is a whistling sound when I breathe out", 'wheezing'),
+    ("My heart is racing even when I sit still", 'rapid_heartbeat'),
+    ("The room spins when I stand up", 'dizziness'),
+    ("My lower back is stiff and sore every morning", 'back_pain'),
+    ("I have been sweating through my sheets at night", 'night_sweats'),
+    ("Red itchy bumps appeared on my arms", 'rash'),
+    ("Everything looks fuzzy when I read", 'blurry_vision'),
+    ("There is a constant buzzing in my ears", 'ear_ringing'),
+    ("It hurts to swallow", 'sore_throat'),
+    ("It burns when I pee", 'uti_symptoms'),
+    ("I feel nervous and restless all the time", 'anxiety'),
+    ("पेट में बहुत जलन हो रही है", 'heartburn'),
+    ("నాకు మోకాలి నొప్పి ఉంది", 'knee_pain'),
+]
+
+# Weak local matches that must not pick the body system: (text, expected system or None)
+SYSTEM_HINT_TRAPS = [
+    ("my eyes burn", 'eyes'),
+    ("i have a heart problem", 'cardiovascular'),
+    ("my utility bill is high", None),
+    ("my tap is leaking", None),
+]
+
+
+# Labeled complaints for the offline classifier. None marks complaints it must
+# leave to Gemini: a different or more serious condition, or not a symptom at all.
+LOCAL_CLASSIFIER_SAMPLES = [
+    ("I have stomach pain", 'stomach_pain'),
+    ("stomach ache since morning", 'stomach_pain'),
+    ("mujhe pet me dard hai", 'stomach_pain'),
+    ("पेट में दर्द", 'stomach_pain'),
+    ("కడుపు నొప్పి", 'stomach_pain'),
+    ("I have a bad cough", 'cough'),
+    ("khansi", 'cough'),
+    ("இருமல்", 'cough'),
+    ("I have a headache since morning", 'headache'),
+    ("सिरदर्द", 'headache'),
+    ("fever", 'fever'),
+    ("I have had a fever for two days", 'fever'),
+    ("bukhar", 'fever'),
+    ("I feel dizzy", 'dizziness'),
+    ("dizziness", 'dizziness'),
+    ("loose motions since yesterday", 'diarrhea'),
+    ("i have diarrhea", 'diarrhea'),
+    ("I have gas", 'gas_problems'),
+    ("I have a sore throat", 'sore_throat'),
+    ("back pain", 'back_pain'),
+    ("I keep vomiting", 'vomiting'),
+    ("constipation", 'constipation'),
+    ("I have a runny nose", 'runny_nose'),
+    ("sneezing a lot", 'sneezing'),
+    ("I can't sleep at night", 'insomnia'),
+    ("I have acidity", 'acid_reflux'),
+    ("hiccups", 'hiccups'),
+    ("my knee hurts", 'knee_pain'),
+    ("I have a rash", 'rash'),
+    ("my skin is itching", 'itching'),
+    ("I have piles", 'hemorrhoids'),
+    ("I have a uti", 'uti_symptoms'),
+    ("burning urination", 'uti_symptoms'),
+    ("I feel anxious all the time", 'anxiety'),
+    ("I am very tired", 'fatigue'),
+    ("I have a toothache", None),
+    ("It burns when I pee", 'uti_symptoms'),
+    ("my eyes burn", 'eye_pain'),
+    ("I am coughing blood", None),
+    ("i have a heart problem", None),
+    ("my utility bill is high", None),
+    ("I burnt my hand on the stove", 'burns'),
+    ("my pet dog is sick", None),
+    ("I have fever and chills", None),
+    ("chest pain and my left arm is numb", None),
+    ("what is the weather today", None),
+    ("hello doctor", None),
+    ("my tap is leaking", None),
+]
+
+
+def bench_local_classifier(min_precision=None):
+    """Precision and coverage of the offline classifier on LOCAL_CLASSIFIER_SAMPLES across thresholds"""
+    import app
+
+    classifier = app.get_symptom_classifier()
+    results = [(text, expected) + classifier.classify(text) for text, expected in LOCAL_CLASSIFIER_SAMPLES]
+
+    def evaluate(threshold):
+        answered = [(text, expected, category) for text, expected, category, confidence in results
+                    if category and confidence >= threshold]
+        correct = sum(category == expected for _, expected, category in answered)
+        return answered, correct
+
+    print(f"samples: {len(results)} ({sum(expected is None for _, expected in LOCAL_CLASSIFIER_SAMPLES)} must go to Gemini)")
+    print(f"{'threshold':>9} {'answered':>9} {'precision':>10}")
+    for threshold in (0.3, 0.4, 0.5, 0.55, 0.6, 0.7, 0.8):
+        answered, correct = evaluate(threshold)
+        precision = correct / len(answered) if answered else 1.0
+        marker = '  <- LOCAL_CLASSIFIER_THRESHOLD' if threshold == app.LOCAL_CLASSIFIER_THRESHOLD else ''
+        print(f"{threshold:>9.2f} {len(answered):>9} {precision:>10.2f}{marker}")
+
+    answered, correct = evaluate(app.LOCAL_CLASSIFIER_THRESHOLD)
+    for text, expected, category in answered:
+        if category != expected:
+            print(f"  wrong: {text!r} -> {category} (expected {expected})")
+    precision = correct / len(answered) if answered else 1.0
+    print(f"at {app.LOCAL_CLASSIFIER_THRESHOLD}: {len(answered)}/{len(results)} answered locally, precision {precision:.2f}")
+    if min_precision is not None and precision < min_precision:
+        print(f"FAIL: local classifier precision below {min_precision}")
+        sys.exit(1)
+
+
+def _approx_tokens(text):
+    return len(text) // 4
+
+
+def bench_classification_prompts(live=False):
+    """Prompt size (and with --live: latency and accuracy) of flat vs. two-stage Gemini classification"""
+    import app
+
+    flat_sizes, staged_sizes, staged_calls, hinted, wrong_hints = [], [], [], 0, []
+    for text, expected in CLASSIFICATION_SAMPLES:
+        flat_sizes.append(_approx_tokens(app.build_symptom_detection_prompt(text)))
+        expected_system = app.CATEGORY_SYSTEM[expected]
+        system = app.local_system_hint(text)
+        if system:
+            hinted += 1
+            staged, calls = app.build_category_selection_prompt(text, system), 1
+            if system != expected_system:
+                wrong_hints.append((text, system, expected_system))
+                # Stage 2 answers "none" and the flat prompt follows
+                staged, calls = staged + app.build_symptom_detection_prompt(text), 2
+        else:
+            staged = app.build_system_selection_prompt(text) + app.build_category_selection_prompt(text, expected_system)
+            calls = 2
+        staged_sizes.append(_approx_tokens(staged))
+        staged_calls.append(calls)
+    for text, expected_system in SYSTEM_HINT_TRAPS:
+        system = app.local_system_hint(text)
+        if system and system != expected_system:
+            wrong_hints.append((text, system, expected_system))
+
+    print(f"samples: {len(CLASSIFICATION_SAMPLES)}, stage 1 skipped by local hint: {hinted}, "
+          f"wrong hints: {len(wrong_hints)} (with {len(SYSTEM_HINT_TRAPS)} trap samples)")
+    for text, system, expected_system in wrong_hints:
+        print(f"  wrong hint {system} (expected {expected_system}): {text}")
+    print(f"flat prompt       ~{sum(flat_sizes) / len(flat_sizes):.0f} tokens per classification")
+    print(f"two-stage prompts ~{sum(staged_sizes) / len(staged_sizes):.0f} tokens per classification, "
+          f"{sum(staged_calls) / len(staged_calls):.1f} sequential Gemini calls (flat: 1)")
+
+    if not live:
+        return
+
+    default_mode = app.SYMPTOM_CLASSIFICATION
+    for mode in ('flat', 'hierarchical'):
+        app.SYMPTOM_CLASSIFICATION = mode
+        correct, elapsed = 0, 0.0
+        for text, expected in CLASSIFICATION_SAMPLES:
+            start = time.perf_counter()
+            # Bypass the offline classifier so only the Gemini path is measured
+            threshold, app.LOCAL_CLASSIFIER_THRESHOLD = app.LOCAL_CLASSIFIER_THRESHOLD, 2.0
+            try:
+                _, category, _ = app.ai_smart_symptom_detection(text, 'en')
+            finally:
+                app.LOCAL_CLASSIFIER_THRESHOLD = threshold
+            elapsed += time.perf_counter() - start
+            correct += category == expected
+        marker = '  <- SYMPTOM_CLASSIFICATION' if mode == default_mode else ''
+        print(f"{mode:>12}: accuracy {correct}/{len(CLASSIFICATION_SAMPLES)}, "
+              f"mean latency {elapsed / len(CLASSIFICATION_SAMPLES) * 1000:.0f}ms{marker}")
+
+
+# Imported lazily on first use; a plain `import app` must not pull these in
+LAZY_MODULES = ('gradio', 'google.generativeai', 'deep_translator', 'fpdf')
+
+
+def _import_profile():
+    """`python -X importtime -c 'import app'` as {module: (self_us, cumulative_us, depth)}, in report order"""
+    env = dict(os.environ, GEMINI_API_KEY=os.environ.get('GEMINI_API_KEY', 'benchmark'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        profile[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return profile
+
+
+def bench_import_time(repeat=5, max_ms=None):
+    """Cold import cost of app.py; --max-ms turns it into a regression check"""
+    profiles = [_import_profile() for _ in range(repeat)]
+    totals = [profile['app'][1] / 1000 for profile in profiles]
+    profile = profiles[-1]
+
+    print(f"import app: median {statistics.median(totals):.0f}ms, min {min(totals):.0f}ms over {repeat} runs")
+    # Children are reported before their parent: walk back from app to its first child
+    entries = list(profile.items())
+    app_index = [name for name, _ in entries].index('app')
+    app_depth = profile['app'][2]
+    direct = []
+    for name, (_, cumulative, depth) in reversed(entries[:app_index]):
+        if depth <= app_depth:
+            break
+        if depth == app_depth + 1:
+            direct.append((cumulative, name))
+    for cumulative, name in sorted(direct, reverse=True)[:10]:
+        print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in profile]
+    if eager:
+        print(f"FAIL: imported at module load: {', '.join(eager)}")
+    if max_ms is not None and statistics.median(totals) > max_ms:
+        print(f"FAIL: median import time above {max_ms}ms")
+    if eager or (max_ms is not None and statistics.median(totals) > max_ms):
+        sys.exit(1)
+
+
+# One sentence per script, repeated into a report-sized diagnosis. 'latin'
+# needs a TTF font (₹ and → are not in the core fonts) but no Indic one, so
+# the Unicode font path is measured on hosts without the Noto Indic fonts too
+REPORT_SAMPLES = {
+    'english': "Your symptoms match a viral fever. Drink plenty of water, rest and keep track of your temperature.",
+    'latin': "Paracetamol costs about ₹30 → take it after food, drink plenty of water and rest.",
+    'hindi': "आपके लक्षण वायरल बुखार से मेल खाते हैं। भरपूर पानी पिएं, आराम करें और तापमान पर नज़र रखें।",
+    'telugu': "మీ లక్షణాలు వైరల్ జ్వరానికి సరిపోలుతున్నాయి. ఎక్కువ నీరు త్రాగండి, విశ్రాంతి తీసుకోండి.",
+    'tamil': "உங்கள் அறிகுறிகள் வைரஸ் காய்ச்சலுடன் பொருந்துகின்றன. நிறைய தண்ணீர் குடித்து ஓய்வெடுக்கவும்."
+}
+INDIC_SAMPLES = ('hindi', 'telugu', 'tamil')
+
+
+def bench_report_render(repeat=20, max_ratio=None):
+    """Per-report PDF render time by script; --max-ratio bounds Indic (TTF fonts) vs. English (core font)"""
+    import logging
+    import reports
+    import report_fonts
+
+    # fpdf2 logs every missing glyph; coverage is reported once below instead
+    logging.getLogger('fpdf').setLevel(logging.ERROR)
+    diagnoses = {script: '\n'.join([sentence] * 8) for script, sentence in REPORT_SAMPLES.items()}
+
+    def render(diagnosis):
+        return reports.render_report_bytes('Benchmark Patient', 30, 'Female', 'English', diagnosis)
+
+    fonts = report_fonts.available_fonts()
+    print(f"fonts: {', '.join(family for family, _ in fonts) or 'none (core Arial only)'}; "
+          f"text shaping: {'uharfbuzz' if report_fonts.text_shaping_available() else 'off (pip install uharfbuzz)'}")
+
+    start = time.perf_counter()
+    _, extension = render(diagnoses['latin'])
+    if extension == '.pdf':
+        print(f"first Unicode report (parses fonts): {(time.perf_counter() - start) * 1000:.1f}ms")
+    else:
+        print("first Unicode report: no Unicode font installed, fell back to the text report")
+
+    medians, uncovered = {}, []
+    for script, diagnosis in diagnoses.items():
+        if render(diagnosis)[1] != '.pdf':
+            uncovered.append(script)
+            print(f"  {script:<10} no installed font covers it (text report)")
+            continue
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data, _ = render(diagnosis)
+            times.append((time.perf_counter() - start) * 1000)
+        medians[script] = statistics.median(times)
+        note = '  (core font)' if reports.core_fonts_cover(diagnosis) else ''
+        print(f"  {script:<10} {medians[script]:>7.1f}ms/report  {len(data) // 1024:>3}KB{note}")
+
+    # English renders with the core font: the baseline the TTF-font reports are held to
+    core = medians['english']
+    if 'latin' in medians:
+        print(f"Unicode font report: {medians['latin'] / core:.2f}x the core-font report")
+    ratios = [medians[script] / core for script in INDIC_SAMPLES if script in medians]
+    if ratios:
+        print(f"slowest Indic script: {max(ratios):.2f}x the core-font report")
+    else:
+        print("Indic ratio not measured: every Indic report fell back to the text renderer")
+    if max_ratio is not None and uncovered:
+        print(f"FAIL: no report font for {', '.join(uncovered)}")
+        sys.exit(1)
+    if max_ratio is not None and max(ratios) > max_ratio:
+        print(f"FAIL: Indic render time above {max_ratio}x the core-font report")
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    'conversation-state': bench_conversation_state,
+    'classification-prompts': bench_classification_prompts,
+    'local-classifier': bench_local_classifier,
+    'import-time': bench_import_time,
+    'report-render': bench_report_render
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MedMind performance benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--live', action='store_true', help="make real Gemini calls where supported")
+    parser.add_argument('--min-precision', type=float, help="local-classifier: fail below this precision")
+    parser.add_argument('--max-ms', type=float, help="import-time: fail when the median import exceeds this")
+    parser.add_argument('--max-ratio', type=float, help="report-render: fail when Indic reports are this much slower than the core-font one")
+    args = parser.parse_args()
+    options = {}
+    if args.live:
+        options['live'] = True
+    if args.max_ms is not None:
+        options['max_ms'] = args.max_ms
+    if args.min_precision is not None:
+        options['min_precision'] = args.min_precision
+    if args.max_ratio is not None:
+        options['max_ratio'] = args.max_ratio
+    BENCHMARKS[args.benchmark](**options)
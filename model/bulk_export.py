@@ -0,0 +1,158 @@
+"""End-of-day bulk export: many completed assessments -> one ZIP of reports.
+
+Assessments are JSON Lines, one object per line with the fields the chat
+stores for a report (patient_name, age, gender, language, diagnosis and an
+optional id). With ASSESSMENT_LOG_PATH set (e.g. cache/assessments.jsonl),
+the chat app appends every completed assessment to a daily file next to it,
+which is deleted after ASSESSMENT_LOG_RETENTION_DAYS (default 7). These files
+hold personal data (names, ages, diagnoses), which is why the log is off by
+default:
+    python bulk_export.py cache/assessments-2026-10-17.jsonl -o reports.zip
+    python bulk_export.py --synthetic 500 -o /tmp/reports.zip   # throughput check
+
+Reports render in parallel worker processes. Only a bounded window of them is
+in flight at once, and each one is written into the archive as soon as it is
+ready, so memory stays flat however many assessments there are.
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from reports import render_report_bytes
+
+# Reports waiting to be written, per worker
+WINDOW_PER_WORKER = 4
+
+
+def read_assessments(path):
+    """Yield assessment dicts from a JSON Lines file ('-' for stdin)"""
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                print(f"Skipping line {line_number}: {e}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def synthetic_assessments(count):
+    for index in range(count):
+        yield {
+            'id': f"synthetic-{index}",
+            'patient_name': f"Patient {index}",
+            'age': 20 + index % 60,
+            'gender': 'Female' if index % 2 else 'Male',
+            'language': 'English',
+            'diagnosis': '\n'.join(f"Finding {line}: symptoms consistent with a mild condition." for line in range(12))
+        }
+
+
+def report_arguments(assessment):
+    """(name, age, gender, language, diagnosis) with the same defaults as the chat app"""
+    return (
+        assessment.get('patient_name', 'Patient'),
+        assessment.get('age', 25),
+        assessment.get('gender', 'Male'),
+        assessment.get('language', 'English'),
+        assessment.get('diagnosis', 'Assessment in progress')
+    )
+
+
+def archive_name(index, assessment, suffix):
+    label = str(assessment.get('id') or assessment.get('patient_name') or 'report')
+    label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('._')[:60] or 'report'
+    return f"{index:06d}-{label}{suffix}"
+
+
+def peak_rss_mb():
+    """(this process, largest worker) peak RSS in MB; ru_maxrss is KB on Linux"""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(own / 1024 / 1024, 1), round(workers / 1024 / 1024, 1)
+
+
+def export_reports(assessments, output_path, workers=None):
+    """Render every assessment into output_path; returns the run's stats"""
+    workers = workers or os.cpu_count() or 1
+    window = workers * WINDOW_PER_WORKER
+    counts = {'exported': 0, 'failed': 0}
+    started_at = time.time()
+
+    temp_path = f"{output_path}.tmp"
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            pending = deque()
+
+            def write_next():
+                index, assessment, future = pending.popleft()
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    print(f"Report {index} failed: {e}")
+                    rendered = None
+                if not rendered:
+                    counts['failed'] += 1
+                    return
+                data, suffix = rendered
+                # PDF streams are already compressed; deflating them again only costs time
+                compress_type = zipfile.ZIP_STORED if suffix == '.pdf' else zipfile.ZIP_DEFLATED
+                archive.writestr(archive_name(index, assessment, suffix), data, compress_type=compress_type)
+                counts['exported'] += 1
+
+            for index, assessment in enumerate(assessments):
+                pending.append((index, assessment, executor.submit(render_report_bytes, *report_arguments(assessment))))
+                if len(pending) >= window:
+                    write_next()
+            while pending:
+                write_next()
+    except BaseException:
+        # Never leave a half-written archive behind
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    os.replace(temp_path, output_path)
+
+    elapsed = time.time() - started_at
+    own_rss, worker_rss = peak_rss_mb()
+    return {
+        **counts,
+        'workers': workers,
+        'seconds': round(elapsed, 2),
+        'reports_per_second': round(counts['exported'] / elapsed, 1) if elapsed else 0.0,
+        'archive_bytes': os.path.getsize(output_path),
+        'peak_rss_mb': own_rss,
+        'peak_worker_rss_mb': worker_rss
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export completed assessments as one ZIP of reports")
+    parser.add_argument('assessments', nargs='?', help="JSON Lines file of assessments ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='medmind_reports.zip')
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="export N generated assessments instead")
+    args = parser.parse_args()
+    if not args.assessments and not args.synthetic:
+        parser.error("give an assessments file or --synthetic N")
+
+    source = synthetic_assessments(args.synthetic) if args.synthetic else read_assessments(args.assessments)
+    stats = export_reports(source, args.output, args.workers)
+    print(f"📦 {stats['exported']} reports ({stats['failed']} failed) -> {args.output} "
+          f"({stats['archive_bytes'] // 1024}KB) in {stats['seconds']}s with {stats['workers']} workers")
+    print(f"   {stats['reports_per_second']} reports/s, peak RSS {stats['peak_rss_mb']}MB "
+          f"(largest worker {stats['peak_worker_rss_mb']}MB)")
@@ -0,0 +1,100 @@
+import sys
+
+ACK_MARKER = "I understand you're experiencing"
+CATEGORY_MARKER = 'CATEGORY:'
+# Assistant messages that contain '?' but are not follow-up questions
+NON_QUESTION_MARKERS = ('Smart Symptom Checker', ACK_MARKER, '🔍', CATEGORY_MARKER)
+
+
+class ConversationState:
+    """Compact per-conversation state, updated in O(1) per message.
+
+    Mirrors what count_questions_in_history, has_symptom_acknowledgment,
+    extract_stored_category and collect_all_responses derive from the full
+    history, so a turn no longer rescans every earlier message.
+    """
+
+    __slots__ = ('categories', 'category', 'questions_asked', 'acknowledged',
+                 'responses', 'response_bytes', 'turns', 'messages_format', 'last_user', 'last_assistant')
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.category = None
+        self.questions_asked = 0
+        self.acknowledged = False
+        self.responses = []
+        self.response_bytes = 0
+        self.turns = 0
+        self.messages_format = False
+        self.last_user = None
+        self.last_assistant = None
+
+    def observe_user(self, message):
+        if message:
+            self.responses.append(message)
+            self.response_bytes += sys.getsizeof(message)
+
+    def observe_assistant(self, message):
+        if not message:
+            return
+        if ACK_MARKER in message:
+            self.acknowledged = True
+        if self.category is None and CATEGORY_MARKER in message:
+            category = message.split(CATEGORY_MARKER)[1].strip()
+            if category in self.categories:
+                self.category = category
+        if '?' in message and not any(marker in message for marker in NON_QUESTION_MARKERS):
+            self.questions_asked += 1
+
+    def record_turn(self, user_message, assistant_message):
+        """Apply one completed exchange (what the chat UI appends to history)"""
+        self.observe_user(user_message)
+        self.observe_assistant(assistant_message)
+        self.turns += 1
+        self.last_user = user_message
+        self.last_assistant = assistant_message
+
+    def approx_bytes(self):
+        """Rough memory footprint, tracked without walking the responses"""
+        return (sys.getsizeof(self) + sys.getsizeof(self.responses) + self.response_bytes +
+                sys.getsizeof(self.last_user) + sys.getsizeof(self.last_assistant))
+
+    def matches(self, history):
+        """O(1) check that this state was built from exactly this history"""
+        if not history:
+            return self.turns == 0
+        last = history[-1]
+        if isinstance(last, dict):
+            return (self.messages_format and len(history) == 2 * self.turns and
+                    last.get('content') == self.last_assistant)
+        if isinstance(last, (list, tuple)) and len(last) >= 2:
+            return (not self.messages_format and len(history) == self.turns and
+                    last[0] == self.last_user and last[1] == self.last_assistant)
+        return False
+
+    @classmethod
+    def from_history(cls, history, categories):
+        """Rebuild the state with a single pass over the history"""
+        state = cls(categories)
+        pending_user = None
+        for exchange in history or []:
+            try:
+                if isinstance(exchange, dict):
+                    state.messages_format = True
+                    content = exchange.get('content', '')
+                    if exchange.get('role') == 'user':
+                        pending_user = content
+                    elif exchange.get('role') == 'assistant':
+                        state.record_turn(pending_user, content)
+                        pending_user = None
+                elif isinstance(exchange, (list, tuple)) and len(exchange) >= 2:
+                    # Tuples history: responses/questions see the str() of each side
+                    state.observe_user(str(exchange[0]))
+                    state.observe_assistant(str(exchange[1]))
+                    state.turns += 1
+                    state.last_user, state.last_assistant = exchange[0], exchange[1]
+            except Exception:
+                continue
+        if pending_user:
+            state.observe_user(pending_user)
+        return state
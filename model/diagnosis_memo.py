@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from symptom_classifier import normalize_symptom_text
+
+# Short answers that mean the same thing to the diagnosis prompt
+ANSWER_SYNONYMS = {
+    'y': 'yes', 'yes': 'yes', 'yeah': 'yes', 'yep': 'yes', 'yup': 'yes', 'sure': 'yes',
+    'haan': 'yes', 'ha': 'yes', 'हाँ': 'yes', 'हां': 'yes',
+    'n': 'no', 'no': 'no', 'nope': 'no', 'nah': 'no', 'not really': 'no',
+    'nahi': 'no', 'nahin': 'no', 'नहीं': 'no'
+}
+
+# Upper bound (inclusive) of each age band
+AGE_BANDS = (1, 5, 12, 17, 29, 44, 59, 74)
+
+
+def normalize_answer(answer):
+    """Casefold, strip punctuation/extra spaces and fold yes/no variants"""
+    text = normalize_symptom_text(answer)
+    return ANSWER_SYNONYMS.get(text, text)
+
+
+def age_band(age):
+    """Coarse age bucket, e.g. '30-44' or '75+'"""
+    try:
+        age = int(float(age))
+    except (TypeError, ValueError):
+        return 'unknown'
+    lower = 0
+    for upper in AGE_BANDS:
+        if age <= upper:
+            return f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
+
+def memo_key(category, answers, age, gender, language=None):
+    """Stable digest of the inputs that shape a diagnosis"""
+    parts = [category, age_band(age), (gender or '').strip().lower(), language or 'English']
+    parts.extend(normalize_answer(answer) for answer in answers)
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class DiagnosisMemo:
+    """Bounded, expiring memo of finished diagnoses.
+
+    Keyed by memo_key(), so assessments with the same category, the same
+    (normalized) answers, age band and gender reuse one Gemini result.
+    """
+
+    def __init__(self, max_entries=1000, ttl_seconds=24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (diagnosis, created_at)
+        self._lock = threading.Lock()
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+
+    def get(self, category, answers, age, gender, language=None):
+        """Memoized diagnosis or None"""
+        key = memo_key(category, answers, age, gender, language)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[1] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return entry[0]
+                del self._entries[key]
+                self.counters['expired'] += 1
+            self.counters['misses'] += 1
+            return None
+
+    def put(self, category, answers, age, gender, diagnosis, language=None):
+        key = memo_key(category, answers, age, gender, language)
+        with self._lock:
+            self._entries[key] = (diagnosis, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['ttl_seconds'] = self.ttl_seconds
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,236 @@
+import asyncio
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying (quota, transient server errors)
+RETRYABLE_STATUS = frozenset([408, 429, 500, 502, 503, 504])
+RETRYABLE_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+
+class GatewayUnavailable(Exception):
+    """Raised instead of calling Gemini (circuit open, or the rate limit wait is too long)"""
+
+
+def is_retryable(error):
+    """Quota / transient errors; google.api_core exceptions carry the HTTP status in .code"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    try:
+        return int(getattr(error, 'code', 0) or 0) in RETRYABLE_STATUS
+    except (TypeError, ValueError):
+        return False
+
+
+class TokenBucket:
+    """Requests-per-second limiter; reserve() hands out waits instead of sleeping"""
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        """Seconds to wait before the request may go out, or None if that exceeds max_wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def available(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.updated
+            return round(min(self.capacity, self.tokens + elapsed * self.rate), 2)
+
+
+class CircuitBreaker:
+    """closed -> open after failure_threshold failed calls; one trial call after reset_timeout"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.trial_in_flight = False
+            if self.state == 'half_open':
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+                return True
+            return self.state == 'closed'
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """Returns True when this failure opened the circuit"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                opened = self.state != 'open'
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+    def release(self):
+        """A call that never reached upstream says nothing about its health"""
+        with self._lock:
+            self.trial_in_flight = False
+
+
+class GeminiGateway:
+    """Single path for Gemini requests: rate limit, retry with jitter, circuit breaker.
+
+    call()/call_async() raise GatewayUnavailable without touching the network
+    while the circuit is open or the token bucket is drained for longer than
+    max_queue_wait, so call sites drop to their local fallbacks immediately.
+    """
+
+    def __init__(self, requests_per_minute=60, burst=10, max_retries=3, base_delay=1.0, max_delay=20.0,
+                 failure_threshold=5, reset_timeout=30.0, max_queue_wait=10.0):
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_queue_wait = max_queue_wait
+        self._lock = threading.Lock()
+        self.counters = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'short_circuited': 0,
+            'circuit_opened': 0,
+            'queued_seconds': 0.0
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _admit(self, last_error=None):
+        """Seconds to wait for a rate-limit token; raises GatewayUnavailable.
+
+        A retry that cannot get a token ends the call with the error it was
+        retrying, which counts against the circuit like exhausted retries.
+        """
+        wait = self.bucket.reserve(self.max_queue_wait)
+        if wait is None:
+            self._count('rate_limited')
+            if last_error is not None:
+                self._failed(last_error, self.max_retries)
+                raise last_error
+            raise GatewayUnavailable("Gemini rate limit reached")
+        if wait:
+            self._count('queued_seconds', wait)
+        return wait
+
+    def _check_circuit(self):
+        self._count('calls')
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise GatewayUnavailable("Gemini circuit open")
+
+    def _failed(self, error, attempt):
+        """Record a failed attempt; True if it should be retried"""
+        if is_retryable(error) and attempt < self.max_retries:
+            self._count('retries')
+            return True
+        self._count('failures')
+        if is_retryable(error):
+            if self.breaker.record_failure():
+                self._count('circuit_opened')
+                print(f"Gemini circuit opened after: {error}")
+        else:
+            # Bad request / safety block: upstream itself is healthy
+            self.breaker.release()
+        return False
+
+    def _succeeded(self):
+        self._count('successes')
+        self.breaker.record_success()
+
+    def call(self, fn, *args, **kwargs):
+        self._check_circuit()
+        attempt = 0
+        last_error = None
+        try:
+            while True:
+                wait = self._admit(last_error)
+                if wait:
+                    time.sleep(wait)
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if not self._failed(e, attempt):
+                        raise
+                    last_error = e
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                self._succeeded()
+                return result
+        except GatewayUnavailable:
+            self.breaker.release()
+            raise
+
+    async def call_async(self, coro_fn, *args, **kwargs):
+        self._check_circuit()
+        attempt = 0
+        last_error = None
+        try:
+            while True:
+                wait = self._admit(last_error)
+                if wait:
+                    await asyncio.sleep(wait)
+                try:
+                    result = await coro_fn(*args, **kwargs)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if not self._failed(e, attempt):
+                        raise
+                    last_error = e
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                self._succeeded()
+                return result
+        except (GatewayUnavailable, asyncio.CancelledError):
+            self.breaker.release()
+            raise
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['queued_seconds'] = round(stats['queued_seconds'], 3)
+        stats['circuit_state'] = self.breaker.state
+        stats['consecutive_failures'] = self.breaker.consecutive_failures
+        stats['tokens_available'] = self.bucket.available()
+        return stats
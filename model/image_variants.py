@@ -0,0 +1,156 @@
+"""Resized / recompressed variants of the landing page images.
+
+Built at server start (incrementally - unchanged sources are skipped) or
+offline with:
+    python image_variants.py
+"""
+import hashlib
+import json
+import os
+import threading
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(MODEL_DIR, '..', 'images')
+VARIANTS_DIR = os.path.join(MODEL_DIR, 'cache', 'images')
+MANIFEST_VERSION = 1
+
+VARIANT_WIDTHS = (320, 640, 1280, 1920)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+MIMETYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageVariants:
+    """Manifest of WebP + original-format variants per source image and width.
+
+    Each variant has a strong ETag (hash of its bytes); version(name) is a
+    short hash of the source, used to fingerprint image URLs.
+    """
+
+    def __init__(self, source_dir=IMAGES_DIR, variants_dir=VARIANTS_DIR, widths=VARIANT_WIDTHS):
+        self.source_dir = source_dir
+        self.variants_dir = variants_dir
+        self.widths = widths
+        self.manifest_path = os.path.join(variants_dir, 'manifest.json')
+        self.images = {}
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('widths') != list(self.widths):
+            return {}
+        return manifest.get('images', {})
+
+    def build(self):
+        """Create missing/stale variants; returns {'built': n, 'reused': n, 'failed': n}"""
+        from PIL import Image
+
+        os.makedirs(self.variants_dir, exist_ok=True)
+        previous = self._load_manifest()
+        images = {}
+        counts = {'built': 0, 'reused': 0, 'failed': 0}
+
+        for name in sorted(os.listdir(self.source_dir)):
+            if not name.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+            with open(os.path.join(self.source_dir, name), 'rb') as f:
+                source_hash = _digest(f.read())
+            entry = previous.get(name)
+            if entry and entry['source_hash'] == source_hash and all(
+                    os.path.exists(os.path.join(self.variants_dir, variant['file'])) for variant in entry['variants']):
+                images[name] = entry
+                counts['reused'] += 1
+                continue
+            try:
+                with Image.open(os.path.join(self.source_dir, name)) as source:
+                    images[name] = self._build_image(name, source, source_hash)
+                counts['built'] += 1
+            except Exception as e:
+                print(f"Image variants failed for {name}: {e}")
+                counts['failed'] += 1
+
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'widths': list(self.widths), 'images': images}, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+        with self._lock:
+            self.images = images
+        return counts
+
+    def _build_image(self, name, source, source_hash):
+        from PIL import Image
+
+        has_alpha = source.mode in ('RGBA', 'LA') or (source.mode == 'P' and 'transparency' in source.info)
+        source = source.convert('RGBA' if has_alpha else 'RGB')
+        fallback_format = 'png' if has_alpha else 'jpeg'
+        stem = os.path.splitext(name)[0]
+
+        widths = sorted({width for width in self.widths if width < source.width} | {source.width})
+        variants = []
+        for width in widths:
+            height = max(1, round(source.height * width / source.width))
+            resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            for image_format in ('webp', fallback_format):
+                file_name = f"{stem}-{width}.{'jpg' if image_format == 'jpeg' else image_format}"
+                path = os.path.join(self.variants_dir, file_name)
+                if image_format == 'webp':
+                    resized.save(path, 'WEBP', quality=WEBP_QUALITY, method=6)
+                elif image_format == 'jpeg':
+                    resized.save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+                else:
+                    resized.save(path, 'PNG', optimize=True)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                variants.append({
+                    'width': width,
+                    'format': image_format,
+                    'file': file_name,
+                    'etag': _digest(data)[:32],
+                    'bytes': len(data)
+                })
+        return {'source_hash': source_hash, 'width': source.width, 'variants': variants}
+
+    def version(self, name):
+        entry = self.images.get(name)
+        return entry['source_hash'][:12] if entry else None
+
+    def select(self, name, accept='', width=None):
+        """Best variant for the Accept header and requested width, or None if unknown"""
+        entry = self.images.get(name)
+        if not entry:
+            return None
+        widths = sorted({variant['width'] for variant in entry['variants']})
+        # Smallest variant at least as wide as requested; full size by default
+        target = widths[-1]
+        if width:
+            target = next((candidate for candidate in widths if candidate >= width), widths[-1])
+        candidates = [variant for variant in entry['variants'] if variant['width'] == target]
+        if 'image/webp' not in (accept or ''):
+            candidates = [variant for variant in candidates if variant['format'] != 'webp']
+        variant = min(candidates, key=lambda candidate: candidate['bytes'])
+        return {
+            'path': os.path.join(self.variants_dir, variant['file']),
+            'mimetype': MIMETYPES[variant['format']],
+            'etag': variant['etag'],
+            'version': self.version(name)
+        }
+
+
+if __name__ == "__main__":
+    variants = ImageVariants()
+    print(variants.build())
+    for name, entry in variants.images.items():
+        original = os.path.getsize(os.path.join(variants.source_dir, name))
+        full_size = [variant for variant in entry['variants'] if variant['width'] == entry['width']]
+        sizes = ', '.join(f"{variant['format']} {variant['bytes'] // 1024}KB" for variant in full_size)
+        print(f"{name}: original {original // 1024}KB -> {sizes} ({len(entry['variants'])} variants)")
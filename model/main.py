@@ -1,80 +1,169 @@
-from flask import Flask, render_template, redirect, send_from_directory
-import subprocess
-import threading
-import time
+from flask import Flask, render_template, redirect, send_from_directory, send_file, request, url_for, abort
+import functools
+import hmac
 import os
+from image_variants import ImageVariants, IMAGES_DIR
+from static_pages import StaticPages
 
 app = Flask(__name__)
 
-# Global variable to track if Gradio is running
-gradio_process = None
-gradio_started = False
+# The chatbot is mounted in this process (see create_server); CHATBOT_URL can
+# point /gradio at a separately deployed chatbot instead
+CHATBOT_PATH = '/chatbot'
+CHATBOT_URL = os.environ.get('CHATBOT_URL', f'{CHATBOT_PATH}/')
+
+# Bearer token for /admin/stats (cache, pool and store counters); unset disables the endpoint
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Landing pages have no per-request data: they are rendered once and served from memory
+PAGES = {
+    'index': 'index.html',
+    'login': 'login.html',
+    'feedback': 'feedback.html',
+    'remedies': 'remedies.html',
+    'explore': 'explore.html',
+    'admin': 'admin.html',
+    'register': 'register.html'
+}
+
+@functools.lru_cache(maxsize=None)
+def get_static_pages():
+    """Render PAGES once, split out fingerprinted CSS/JS and precompress everything"""
+    pages = StaticPages()
+    with app.test_request_context('/'):
+        totals = pages.build(render_template, PAGES)
+    print(f"📄 Prerendered {len(pages.pages)} pages, {len(pages.assets)} assets: "
+          + ', '.join(f"{encoding} {size // 1024}KB" for encoding, size in totals.items()))
+    return pages
+
+def serve_static(entry):
+    status, headers, body = get_static_pages().lookup(
+        entry, request.headers.get('Accept-Encoding'), request.if_none_match
+    )
+    return app.response_class(body, status=status, headers=headers, content_type=headers.pop('Content-Type'))
+
+def serve_page(page):
+    return serve_static(get_static_pages().pages[page])
+
+@app.route('/assets/<filename>')
+def serve_assets(filename):
+    entry = get_static_pages().assets.get(filename)
+    if entry is None:
+        abort(404)
+    return serve_static(entry)
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return serve_page('index')
 
 @app.route('/login')
 def login():
-    return render_template('login.html')
+    return serve_page('login')
 
 @app.route('/feedback')
 def feedback():
-    return render_template('feedback.html')
+    return serve_page('feedback')
 
 @app.route('/remedies')
 def remedies():
-    return render_template('remedies.html')
+    return serve_page('remedies')
 
 @app.route('/explore')
 def explore():
-    return render_template('explore.html')
+    return serve_page('explore')
 
 @app.route('/admin')
 def admin():
-    return render_template('admin.html')
+    return serve_page('admin')
 
 @app.route('/register')
 def register():
-    return render_template('register.html')
+    return serve_page('register')
 
 @app.route('/gradio')
 def start_gradio():
-    global gradio_process, gradio_started
-    
-    # Only start Gradio if it's not already running
-    if not gradio_started:
-        def run_gradio():
-            global gradio_process, gradio_started
-            try:
-                # Start the Gradio app
-                gradio_process = subprocess.Popen(['python', 'app.py'])
-                gradio_started = True
-                print("🤖 MedMind Gradio chatbot started!")
-            except Exception as e:
-                print(f"Error starting Gradio: {e}")
-        
-        # Start Gradio in a separate thread
-        gradio_thread = threading.Thread(target=run_gradio)
-        gradio_thread.daemon = True
-        gradio_thread.start()
-        
-        # Wait a moment for Gradio to start
-        time.sleep(2)
-    
-    # Redirect to the Gradio interface
-    return redirect('https://medmind-chatbot-gztj.onrender.com/')
+    # The chatbot is already running in-process - redirect straight away
+    return redirect(CHATBOT_URL)
+
+@functools.lru_cache(maxsize=None)
+def get_image_variants():
+    """Resized WebP/JPEG/PNG variants of images/, built (incrementally) on first use"""
+    variants = ImageVariants()
+    print(f"🖼️ Image variants: {variants.build()}")
+    return variants
+
+@app.context_processor
+def image_helpers():
+    def image_url(filename, width=None):
+        """Fingerprinted /images URL, so the response can be cached as immutable"""
+        return url_for('serve_images', filename=filename, w=width, v=get_image_variants().version(filename))
+    return {'image_url': image_url}
 
 # Serve images from the images folder
 @app.route('/images/<filename>')
 def serve_images(filename):
-    return send_from_directory('../images', filename)
+    variant = get_image_variants().select(filename, request.headers.get('Accept', ''), request.args.get('w', type=int))
+    if variant is None:
+        return send_from_directory(IMAGES_DIR, filename)
+    
+    if request.if_none_match.contains_weak(variant['etag']):
+        response = app.response_class(status=304)
+    else:
+        response = send_file(variant['path'], mimetype=variant['mimetype'], etag=False, conditional=False)
+    response.set_etag(variant['etag'])
+    # Only a URL carrying the current source fingerprint may be cached forever
+    if request.args.get('v') == variant['version']:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.headers['Vary'] = 'Accept'
+    return response
+
+def create_server():
+    """One ASGI app: the Gradio chatbot under CHATBOT_PATH, the Flask landing pages everywhere else"""
+    from fastapi import FastAPI, Header, HTTPException
+    from fastapi.middleware.wsgi import WSGIMiddleware
+    import gradio as gr
+    from report_fonts import uncovered_scripts
+    from app import (create_complete_medmind_app, get_runtime_stats, report_download_response,
+                     REPORT_DOWNLOAD_PATH, start_question_bank_build)
+    
+    server = FastAPI()
+    get_image_variants()
+    get_static_pages()
+    start_question_bank_build()
+    missing_scripts = uncovered_scripts()
+    if missing_scripts:
+        print(f"⚠️ No report font for {', '.join(missing_scripts)}: those reports are plain text "
+              f"(apt install fonts-noto-core or copy Noto*.ttf into model/fonts)")
+    
+    @server.get('/healthz')
+    def healthz():
+        return {'status': 'ok', 'chatbot': CHATBOT_PATH}
+    
+    @server.get('/admin/stats')
+    def admin_stats(authorization: str = Header(default='')):
+        if not ADMIN_TOKEN:
+            raise HTTPException(status_code=404)
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {ADMIN_TOKEN}'.encode()):
+            raise HTTPException(status_code=401, headers={'WWW-Authenticate': 'Bearer'})
+        return get_runtime_stats()
+    
+    @server.get(f'{REPORT_DOWNLOAD_PATH}/{{key}}')
+    def download_report(key: str):
+        return report_download_response(key)
+    
+    server = gr.mount_gradio_app(server, create_complete_medmind_app(), path=CHATBOT_PATH)
+    # Mounted last so the chatbot and health routes take precedence
+    server.mount('/', WSGIMiddleware(app))
+    return server
 
 if __name__ == "__main__":
-    print("🌐 Starting MedMind Flask Server...")
+    import uvicorn
+    
+    print("🌐 Starting MedMind Server...")
     print("📋 Landing pages will be available at http://localhost:5000")
-    print("🤖 Chatbot will start only when accessed via /gradio")
+    print(f"🤖 Chatbot is served in-process at http://localhost:5000{CHATBOT_PATH}/")
     
-    # Start Flask (NO automatic Gradio startup)
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    uvicorn.run(create_server(), host="0.0.0.0", port=port)
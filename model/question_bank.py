@@ -0,0 +1,155 @@
+"""Pre-translated SYMPTOM_QUESTIONS bank.
+
+The follow-up questions never change, so they are translated once by this
+build step instead of by a live GoogleTranslator call on every chat turn.
+
+Build or refresh the artifact (needs network access, run from model/):
+    python question_bank.py
+The server also builds it in the background at startup when it is missing or
+stale (see ensure_question_bank; QUESTION_BANK_AUTOBUILD=0 turns that off).
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+# Bump when the artifact layout changes; older files are ignored at startup
+QUESTION_BANK_VERSION = 1
+QUESTION_BANK_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'translations', 'question_bank.json'
+)
+
+
+def unique_questions(symptom_questions):
+    """All questions in dict order, without duplicates"""
+    seen = {}
+    for questions in symptom_questions.values():
+        for question in questions:
+            seen.setdefault(question, None)
+    return list(seen)
+
+
+def question_bank_source_hash(symptom_questions):
+    """Fingerprint of the English source so stale artifacts are easy to spot"""
+    payload = json.dumps(unique_questions(symptom_questions), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_question_bank(path=QUESTION_BANK_PATH):
+    """Load {lang_code: {english_question: translation}}; empty dict if unavailable"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"DEBUG: No question bank at {path}, using live translation")
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Question bank load failed: {e}")
+        return {}
+
+    if data.get('version') != QUESTION_BANK_VERSION:
+        print(f"DEBUG: Ignoring question bank version {data.get('version')} (expected {QUESTION_BANK_VERSION})")
+        return {}
+
+    translations = data.get('translations', {})
+    print(f"DEBUG: Loaded question bank for {len(translations)} languages")
+    return translations
+
+
+def question_bank_is_current(symptom_questions, languages, path=QUESTION_BANK_PATH):
+    """True when the artifact matches the current questions and has all of them in every language.
+
+    A build with failed translations still writes the artifact, so a language
+    missing some questions counts as stale and the next build retries them.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    translations = data.get('translations', {})
+    questions = set(unique_questions(symptom_questions))
+    return (
+        data.get('version') == QUESTION_BANK_VERSION
+        and data.get('source_hash') == question_bank_source_hash(symptom_questions)
+        and all(questions <= translations.get(lang_code, {}).keys()
+                for lang_code in languages.values() if lang_code != 'en')
+    )
+
+
+def ensure_question_bank(symptom_questions, languages, path=QUESTION_BANK_PATH):
+    """Build the artifact if it is missing or stale; True when a new one was written"""
+    if question_bank_is_current(symptom_questions, languages, path):
+        return False
+    print("🌍 Question bank missing or stale, building it...")
+    return build_question_bank(symptom_questions, languages, path) is not None
+
+
+def build_question_bank(symptom_questions, languages, path=QUESTION_BANK_PATH,
+                        translator_factory=None, retries=3, max_consecutive_failures=10):
+    """Translate every question into every language and write the artifact.
+
+    Entries already present in an existing artifact are reused, so re-running
+    after adding questions only translates the new ones. Gives up without
+    writing anything after max_consecutive_failures failed questions in a row
+    (no network), and returns None in that case.
+    """
+    if translator_factory is None:
+        from deep_translator import GoogleTranslator
+
+        def translator_factory(lang_code):
+            return GoogleTranslator(source='en', target=lang_code)
+
+    questions = unique_questions(symptom_questions)
+    translations = load_question_bank(path)
+    failed = 0
+    consecutive_failures = 0
+
+    for language_name, lang_code in languages.items():
+        if lang_code == 'en':
+            continue
+        translator = translator_factory(lang_code)
+        bank = translations.setdefault(lang_code, {})
+        pending = [question for question in questions if question not in bank]
+        print(f"🌍 {language_name}: {len(pending)} of {len(questions)} questions to translate")
+
+        for question in pending:
+            for attempt in range(retries):
+                try:
+                    translated = translator.translate(question)
+                    if translated:
+                        bank[question] = translated
+                    consecutive_failures = 0
+                    break
+                except Exception as e:
+                    print(f"Translation failed ({lang_code}, attempt {attempt + 1}): {e}")
+                    time.sleep(2 ** attempt)
+            else:
+                failed += 1
+                consecutive_failures += 1
+                if consecutive_failures >= max_consecutive_failures:
+                    print(f"❌ Question bank build aborted after {consecutive_failures} failed translations in a row")
+                    return None
+
+    artifact = {
+        'version': QUESTION_BANK_VERSION,
+        'source_hash': question_bank_source_hash(symptom_questions),
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'translations': translations
+    }
+
+    # Write to a temp file first so a crashed build never leaves a truncated artifact
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+    print(f"✅ Question bank written to {path} ({failed} translations failed)")
+    return artifact
+
+
+if __name__ == "__main__":
+    from app import SYMPTOM_QUESTIONS, LANGUAGES
+    build_question_bank(SYMPTOM_QUESTIONS, LANGUAGES)
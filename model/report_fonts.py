@@ -0,0 +1,221 @@
+"""Unicode TTF fonts for PDF reports, reduced once to the scripts reports use.
+
+The core PDF fonts are latin-1 only, so Indic diagnoses came out empty. The
+reports use a Unicode font (Noto Sans or DejaVu Sans) with per-script Noto
+fonts as fallbacks. Fonts are looked up in REPORT_FONT_DIR, model/fonts and
+the usual system font directories, for example:
+    apt install fonts-noto-core   # or copy Noto*.ttf into model/fonts
+Each font is first cut down to the scripts reports can contain and cached in
+model/cache/fonts, which keeps the per-report glyph subsetting fast, and is
+parsed once per process rather than on every report. Indic conjuncts are
+shaped when uharfbuzz is installed. No fonts are shipped: text that no
+installed font covers raises FontCoverageError, and reports.py writes a
+UTF-8 text report instead of a PDF with blank words.
+"""
+import copy
+import functools
+import hashlib
+import importlib.util
+import os
+import re
+import unicodedata
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_DIRS = [
+    os.getenv('REPORT_FONT_DIR', ''),
+    os.path.join(MODEL_DIR, 'fonts'),
+    '/usr/share/fonts/truetype/noto',
+    '/usr/share/fonts/noto',
+    '/usr/share/fonts/truetype/dejavu',
+    '/usr/share/fonts/dejavu'
+]
+REDUCED_FONTS_DIR = os.path.join(MODEL_DIR, 'cache', 'fonts')
+
+# Latin, punctuation, currency, arrows/shapes (incl. the dotted circle used by
+# Indic shaping) and the Indic blocks from Devanagari to Malayalam
+REPORT_UNICODE_RANGES = (
+    (0x0020, 0x024F),
+    (0x2000, 0x206F),
+    (0x20A0, 0x20CF),
+    (0x2100, 0x214F),
+    (0x2190, 0x21FF),
+    (0x25A0, 0x25FF),
+    (0x0900, 0x0DFF)
+)
+
+# Emoji and pictographs (the diagnosis headings use 🔍 ⚠️ 📋 💡) have no glyph
+# in these fonts and would come out as boxes, so they are dropped
+REPORT_SYMBOLS = re.compile('[\u2600-\u27BF\u2B00-\u2BFF\uFE00-\uFE0F\u200D\U0001F000-\U0001FAFF]')
+
+# (family, regular file, bold file): the first one found is the main font,
+# the rest are fallbacks for characters it has no glyph for
+UNICODE_FONTS = [
+    ('NotoSans', 'NotoSans-Regular.ttf', 'NotoSans-Bold.ttf'),
+    ('DejaVuSans', 'DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),
+    ('NotoSansDevanagari', 'NotoSansDevanagari-Regular.ttf', 'NotoSansDevanagari-Bold.ttf'),  # Hindi, Marathi
+    ('NotoSansBengali', 'NotoSansBengali-Regular.ttf', 'NotoSansBengali-Bold.ttf'),  # Bengali, Assamese
+    ('NotoSansTelugu', 'NotoSansTelugu-Regular.ttf', 'NotoSansTelugu-Bold.ttf'),
+    ('NotoSansTamil', 'NotoSansTamil-Regular.ttf', 'NotoSansTamil-Bold.ttf'),
+    ('NotoSansGujarati', 'NotoSansGujarati-Regular.ttf', 'NotoSansGujarati-Bold.ttf'),
+    ('NotoSansKannada', 'NotoSansKannada-Regular.ttf', 'NotoSansKannada-Bold.ttf'),
+    ('NotoSansMalayalam', 'NotoSansMalayalam-Regular.ttf', 'NotoSansMalayalam-Bold.ttf'),
+    ('NotoSansGurmukhi', 'NotoSansGurmukhi-Regular.ttf', 'NotoSansGurmukhi-Bold.ttf'),  # Punjabi
+    ('NotoSansOriya', 'NotoSansOriya-Regular.ttf', 'NotoSansOriya-Bold.ttf')
+]
+
+
+class FontCoverageError(Exception):
+    """Raised when no installed font has glyphs for some of the report text"""
+
+
+def strip_symbols(text):
+    """text without the emoji and pictographs the report fonts cannot draw"""
+    return REPORT_SYMBOLS.sub('', text)
+
+
+def find_font(filename):
+    for directory in FONT_DIRS:
+        if directory:
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def available_fonts():
+    """[(family, {style: path})] for the fonts installed on this host"""
+    fonts = []
+    for family, regular, bold in UNICODE_FONTS:
+        regular_path = find_font(regular)
+        if regular_path:
+            # Without a bold file, bold text falls back to the regular face
+            fonts.append((family, {'': regular_path, 'B': find_font(bold) or regular_path}))
+    return fonts
+
+
+@functools.lru_cache(maxsize=None)
+def text_shaping_available():
+    return importlib.util.find_spec('uharfbuzz') is not None
+
+
+@functools.lru_cache(maxsize=None)
+def reduced_font_path(path):
+    """Copy of the font limited to REPORT_UNICODE_RANGES, built on first use; path itself if that fails"""
+    with open(path, 'rb') as f:
+        source_hash = hashlib.sha256(f.read() + repr(REPORT_UNICODE_RANGES).encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    reduced_path = os.path.join(REDUCED_FONTS_DIR, f"{stem}-{source_hash}.ttf")
+    if os.path.exists(reduced_path):
+        return reduced_path
+    try:
+        from fontTools import subset as ftsubset, ttLib
+
+        font = ttLib.TTFont(path)
+        # Keep the layout tables (GSUB/GPOS) that shaping needs
+        options = ftsubset.Options(layout_features=['*'], notdef_outline=True, glyph_names=True,
+                                   name_IDs=['*'], name_languages=['*'])
+        subsetter = ftsubset.Subsetter(options)
+        subsetter.populate(unicodes=[codepoint for start, end in REPORT_UNICODE_RANGES
+                                     for codepoint in range(start, end + 1)])
+        subsetter.subset(font)
+        os.makedirs(REDUCED_FONTS_DIR, exist_ok=True)
+        temp_path = f"{reduced_path}.tmp{os.getpid()}"
+        font.save(temp_path)
+        os.replace(temp_path, reduced_path)
+        return reduced_path
+    except Exception as e:
+        print(f"DEBUG: Could not reduce font {path}: {e}")
+        return path
+
+
+@functools.lru_cache(maxsize=None)
+def _cmap(path):
+    """Codepoints the font has glyphs for"""
+    from fontTools import ttLib
+
+    font = ttLib.TTFont(path, lazy=True)
+    try:
+        return frozenset(font.getBestCmap())
+    finally:
+        font.close()
+
+
+@functools.lru_cache(maxsize=None)
+def _parsed_font(path, style):
+    """fpdf2 font for path with its widths and glyph ids worked out, parsed once per process"""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_font('parsed', style, path)
+    return pdf.fonts[f"parsed{style}"]
+
+
+def _add_font(pdf, family, style, path):
+    """pdf.add_font(family, style, path) without parsing the font file again.
+
+    fpdf2 has no API for reusing a parsed font, so the per-process copy is
+    cloned and the parts a document changes are reset: output() subsets the
+    fontTools font in place, so every report opens its own.
+    """
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+
+    font = copy.copy(_parsed_font(path, style))
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = f"{family.lower()}{style}"
+    font.ttfont = ttLib.TTFont(path, recalcTimestamp=False)
+    font.subset = SubsetMap(font)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    pdf.fonts[font.fontkey] = font
+
+
+def _scripts(codepoints):
+    """Script names (DEVANAGARI, TELUGU, ...) of codepoints, for error messages"""
+    return sorted({unicodedata.name(chr(codepoint), 'UNKNOWN').split()[0] for codepoint in codepoints})
+
+
+def uncovered_scripts():
+    """Scripts of the chat languages that no installed font can draw (reports fall back to text)"""
+    letters = 'कকਕકକகకಕക'  # KA of Devanagari, Bengali, Gurmukhi, ..., Malayalam
+    fonts = available_fonts()
+    return _scripts(ord(letter) for letter in letters
+                    if not any(ord(letter) in _cmap(reduced_font_path(styles[''])) for _, styles in fonts))
+
+
+def setup_unicode_fonts(pdf, text=''):
+    """Register the Unicode fonts text needs on pdf; returns the main family.
+
+    Raises FontCoverageError when the installed fonts can't draw all of text,
+    rather than rendering a report with blank or boxed-out words.
+    """
+    fonts = available_fonts()
+    if not fonts:
+        raise FontCoverageError(f"No Unicode report font installed for {', '.join(_scripts(map(ord, text)))} text "
+                                f"(apt install fonts-noto-core or copy Noto*.ttf into {FONT_DIRS[1]})")
+    main_family, main_styles = fonts[0]
+    for style, path in main_styles.items():
+        _add_font(pdf, main_family, style, reduced_font_path(path))
+
+    # Every registered font is embedded, so fallbacks are only added for scripts the text uses
+    main_cmap = _cmap(reduced_font_path(main_styles['']))
+    missing = {ord(char) for char in text if not char.isspace() and ord(char) not in main_cmap}
+    fallbacks = []
+    for family, styles in fonts[1:]:
+        if not missing:
+            break
+        path = reduced_font_path(styles[''])
+        covered = {codepoint for codepoint in missing if codepoint in _cmap(path)}
+        if covered:
+            _add_font(pdf, family, '', path)
+            fallbacks.append(family)
+            missing -= covered
+    if missing:
+        raise FontCoverageError(f"No installed report font covers {', '.join(_scripts(missing))} "
+                                f"(apt install fonts-noto-core or copy Noto*.ttf into {FONT_DIRS[1]})")
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks, exact_match=False)
+    if text_shaping_available():
+        pdf.set_text_shaping(True)
+    return main_family
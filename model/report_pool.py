@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ReportQueueFull(Exception):
+    """Raised when max_pending reports are already queued or rendering"""
+
+
+def _timed_call(fn, args, submitted_at):
+    """Runs in the worker: (result, queue_wait_seconds, render_seconds)"""
+    started_at = time.time()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class ReportPool:
+    """Bounded worker pool for CPU-bound report rendering.
+
+    Uses worker processes (PDF layout holds the GIL) unless use_processes is
+    False. They are started with forkserver (spawn where that is missing),
+    not fork: a forked worker would inherit the web server's threads, locks
+    and open sockets. Workers re-import the main script, so it needs an
+    `if __name__ == "__main__":` guard (main.py and app.py have one).
+
+    At most max_pending reports may be queued or rendering; further
+    submissions raise ReportQueueFull instead of piling up. Queue wait and
+    render time are recorded separately.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, use_processes=True, start_method=None, history_size=100):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.recent = deque(maxlen=history_size)  # (queue_wait, render) seconds
+        self.counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0
+        }
+
+    def _get_executor(self):
+        """Workers are started on the first report, not at import"""
+        if self._executor is None:
+            if self.use_processes:
+                context = multiprocessing.get_context(self.start_method)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='report')
+        return self._executor
+
+    def submit(self, fn, *args):
+        """concurrent.futures.Future of (result, timings); raises ReportQueueFull"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise ReportQueueFull(f"{self.pending} reports already pending")
+            self.pending += 1
+            self.counters['submitted'] += 1
+            executor = self._get_executor()
+
+        try:
+            future = executor.submit(_timed_call, fn, args, time.time())
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+                self.counters['failed'] += 1
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.counters['failed'] += 1
+                return
+            _, queue_wait, render = future.result()
+            self.counters['completed'] += 1
+            self.recent.append((queue_wait, render))
+
+    def render(self, fn, *args):
+        """Blocking: (result, {'queue_wait': s, 'render': s})"""
+        result, queue_wait, render = self.submit(fn, *args).result()
+        return result, {'queue_wait': round(queue_wait, 4), 'render': round(render, 4)}
+
+    async def render_async(self, fn, *args):
+        """Awaitable variant of render(); the event loop is free while the report renders"""
+        result, queue_wait, render = await asyncio.wrap_future(self.submit(fn, *args))
+        return result, {'queue_wait': round(queue_wait, 4), 'render': round(render, 4)}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['pending'] = self.pending
+            stats['max_pending'] = self.max_pending
+            stats['workers'] = self.max_workers
+            stats['mode'] = 'processes' if self.use_processes else 'threads'
+            recent = list(self.recent)
+        if recent:
+            waits = sorted(wait for wait, _ in recent)
+            renders = sorted(render for _, render in recent)
+            stats['queue_wait_avg'] = round(sum(waits) / len(waits), 4)
+            stats['queue_wait_max'] = round(waits[-1], 4)
+            stats['render_avg'] = round(sum(renders) / len(renders), 4)
+            stats['render_max'] = round(renders[-1], 4)
+        return stats
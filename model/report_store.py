@@ -0,0 +1,218 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Bump when report layout changes so old files are not reused
+REPORT_FORMAT_VERSION = 2
+TMP_PREFIX = '.tmp-'
+
+
+def report_key(*inputs):
+    """Content address of a report: hash of everything rendered into it"""
+    data = '\x1f'.join(str(part) for part in (REPORT_FORMAT_VERSION,) + inputs)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ReportStore:
+    """Directory of rendered reports named by report_key().
+
+    Repeated requests for the same inputs reuse one file. Total size is
+    capped at max_bytes with LRU eviction, and a janitor thread removes
+    reports not accessed for ttl_seconds.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, ttl_seconds=24 * 3600, janitor_interval=300):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._index = OrderedDict()  # key -> [path, size, last_access]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'stored': 0,
+            'evicted_lru': 0,
+            'expired': 0
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        if janitor_interval:
+            threading.Thread(target=self._janitor, args=(janitor_interval,), daemon=True,
+                             name='report-janitor').start()
+
+    def _load(self):
+        """Index files left by a previous run (oldest access first); drop half-written ones"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(TMP_PREFIX):
+                os.unlink(path)
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, os.path.splitext(name)[0], path, stat.st_size))
+        for last_access, key, path, size in sorted(entries):
+            self._index[key] = [path, size, last_access]
+            self._total_bytes += size
+
+    def get(self, key):
+        """Path of the stored report or None"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or not os.path.exists(entry[0]):
+                if entry is not None:
+                    self._remove(key, None)
+                self.counters['misses'] += 1
+                return None
+            entry[2] = time.time()
+            self._index.move_to_end(key)
+            self.counters['hits'] += 1
+            path = entry[0]
+        try:
+            os.utime(path)  # keeps the LRU order across restarts
+        except OSError:
+            pass
+        return path
+
+    def staging_stem(self):
+        """Unique path stem to render into before put()"""
+        return os.path.join(self.directory, f"{TMP_PREFIX}{uuid.uuid4().hex}")
+
+    def put(self, key, rendered_path):
+        """Move a rendered file into the store under key; returns its final path"""
+        path = os.path.join(self.directory, key + os.path.splitext(rendered_path)[1])
+        os.replace(rendered_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            if key in self._index:
+                self._remove(key, None, unlink=self._index[key][0] != path)
+            self._index[key] = [path, size, time.time()]
+            self._total_bytes += size
+            self.counters['stored'] += 1
+            # Never evict the report that was just stored
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                self._remove(next(iter(self._index)), 'evicted_lru')
+        return path
+
+    def _remove(self, key, reason, unlink=True):
+        """Drop key from the index (and disk); caller holds the lock"""
+        path, size, _ = self._index.pop(key)
+        self._total_bytes -= size
+        if reason:
+            self.counters[reason] += 1
+        if unlink:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            # LRU order: stop at the first recently used report
+            while self._index:
+                key, entry = next(iter(self._index.items()))
+                if entry[2] >= cutoff:
+                    break
+                self._remove(key, 'expired')
+
+    def _janitor(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.purge_expired()
+            except Exception as e:
+                print(f"Report janitor failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['files'] = len(self._index)
+            stats['bytes'] = self._total_bytes
+            stats['max_bytes'] = self.max_bytes
+        stats['usage'] = round(stats['bytes'] / self.max_bytes, 4) if self.max_bytes else 0.0
+        try:
+            disk = shutil.disk_usage(self.directory)
+            stats['disk_free_bytes'] = disk.free
+            stats['disk_used_ratio'] = round(disk.used / disk.total, 4)
+        except OSError:
+            pass
+        return stats
+
+
+class MemoryReportStore:
+    """In-memory counterpart of ReportStore: report bytes by report_key().
+
+    For hosts with small or slow disks. Capped at max_bytes with LRU
+    eviction; reports not accessed for ttl_seconds expire on the next
+    get()/put().
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl_seconds=3600):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._index = OrderedDict()  # key -> [data, suffix, last_access]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'stored': 0,
+            'evicted_lru': 0,
+            'expired': 0
+        }
+
+    def _remove(self, key, reason):
+        """Caller holds the lock"""
+        data, _, _ = self._index.pop(key)
+        self._total_bytes -= len(data)
+        if reason:
+            self.counters[reason] += 1
+
+    def _purge_expired(self):
+        """Caller holds the lock"""
+        cutoff = time.time() - self.ttl_seconds
+        while self._index:
+            key, entry = next(iter(self._index.items()))
+            if entry[2] >= cutoff:
+                break
+            self._remove(key, 'expired')
+
+    def get(self, key):
+        """(data, suffix) or None"""
+        with self._lock:
+            self._purge_expired()
+            entry = self._index.get(key)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            entry[2] = time.time()
+            self._index.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry[0], entry[1]
+
+    def put(self, key, data, suffix):
+        with self._lock:
+            self._purge_expired()
+            if key in self._index:
+                self._remove(key, None)
+            self._index[key] = [bytes(data), suffix, time.time()]
+            self._total_bytes += len(data)
+            self.counters['stored'] += 1
+            # Never evict the report that was just stored
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                self._remove(next(iter(self._index)), 'evicted_lru')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['files'] = len(self._index)
+            stats['bytes'] = self._total_bytes
+            stats['max_bytes'] = self.max_bytes
+        stats['usage'] = round(stats['bytes'] / self.max_bytes, 4) if self.max_bytes else 0.0
+        stats['mode'] = 'memory'
+        return stats
@@ -0,0 +1,203 @@
+"""Report rendering (PDF via fpdf2, plain text fallback).
+
+Kept free of app.py imports so report_pool can run it in worker processes.
+"""
+import io
+import os
+import tempfile
+from datetime import datetime
+from report_fonts import FontCoverageError, setup_unicode_fonts, strip_symbols
+
+# The core PDF fonts (Arial/Helvetica) draw WinAnsi: latin-1 plus bullets,
+# dashes and curly quotes. Text they cover needs no embedded TTF font.
+CORE_FONT_ENCODING = 'windows-1252'
+
+def core_fonts_cover(text):
+    try:
+        text.encode(CORE_FONT_ENCODING)
+        return True
+    except UnicodeEncodeError:
+        return False
+
+def _output_path(output_stem, suffix):
+    if output_stem:
+        return f"{output_stem}{suffix}"
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    temp_file.close()
+    return temp_file.name
+
+# SIMPLIFIED REPORT GENERATION (keeping the working version)
+def create_bulletproof_report(name, age, gender, language, diagnosis, output_stem=None, buffer=None):
+    """Create a report that ALWAYS works.
+
+    Written to output_stem + '.pdf' / '.txt' when given, else to a temp file.
+    With buffer (a BytesIO) nothing touches the disk: the report is written
+    into it and its suffix is returned instead of a path.
+    """
+    try:
+        return create_fpdf2_report(name, age, gender, language, diagnosis, output_stem, buffer)
+    except ImportError:
+        print("DEBUG: fpdf2 not available, trying text report...")
+    except FontCoverageError as e:
+        # A PDF would silently drop these words; the UTF-8 text report shows them
+        print(f"⚠️ PDF report fonts missing, writing a text report instead: {e}")
+    except Exception as e:
+        print(f"DEBUG: fpdf2 failed: {e}")
+    
+    try:
+        if buffer is not None:
+            buffer.seek(0)
+            buffer.truncate()
+        return create_text_report(name, age, gender, language, diagnosis, output_stem, buffer)
+    except Exception as e:
+        print(f"DEBUG: Text report failed: {e}")
+        return None
+
+def render_report_bytes(name, age, gender, language, diagnosis):
+    """In-memory report: (bytes, '.pdf' | '.txt') or None; picklable for report_pool workers"""
+    buffer = io.BytesIO()
+    suffix = create_bulletproof_report(name, age, gender, language, diagnosis, buffer=buffer)
+    return (buffer.getvalue(), suffix) if suffix else None
+
+def create_fpdf2_report(name, age, gender, language, diagnosis, output_stem=None, buffer=None):
+    """Create PDF using fpdf2"""
+    from fpdf import FPDF
+    
+    pdf = FPDF(orientation='P', unit='mm', format='A4')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    
+    name = strip_symbols(str(name))
+    diagnosis = strip_symbols(diagnosis) if diagnosis else diagnosis
+    
+    # Embedding a TTF font costs ~5x the render time, so only text the core fonts can't draw gets one
+    pdf.core_fonts_encoding = CORE_FONT_ENCODING
+    text = f"{name}{gender}{language}{diagnosis or ''}"
+    unicode_font = None if core_fonts_cover(text) else setup_unicode_fonts(pdf, text)
+    font = unicode_font or 'Arial'
+    
+    # Header
+    pdf.set_fill_color(70, 130, 180)
+    pdf.rect(0, 0, 210, 30, 'F')
+    
+    pdf.set_font(font, 'B', 18)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_xy(10, 8)
+    pdf.cell(0, 10, 'MedMind AI - Medical Assessment Report', 0, 1, 'C')
+    
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_y(35)
+    
+    # Patient Information
+    pdf.set_font(font, 'B', 14)
+    pdf.cell(0, 10, 'Patient Information', 0, 1, 'L')
+    pdf.ln(5)
+    
+    pdf.set_font(font, '', 11)
+    patient_info = [
+        f'Name: {name}',
+        f'Age: {age} years',
+        f'Gender: {gender}',
+        f'Language: {language}',
+        f'Assessment Date: {datetime.now().strftime("%B %d, %Y")}'
+    ]
+    
+    for info in patient_info:
+        pdf.cell(0, 7, info, 0, 1, 'L')
+    pdf.ln(8)
+    
+    # Medical Assessment
+    pdf.set_font(font, 'B', 14)
+    pdf.cell(0, 10, 'Medical Assessment Results', 0, 1, 'L')
+    pdf.ln(5)
+    
+    pdf.set_font(font, '', 10)
+    
+    if diagnosis and len(diagnosis.strip()) > 10:
+        lines = diagnosis.split('\n')
+        for line in lines:
+            line = line.strip()
+            if line:
+                # Wrapped to the page width instead of cut at 85 characters
+                pdf.multi_cell(0, 6, line, align='L', new_x='LMARGIN', new_y='NEXT')
+                pdf.ln(1)
+    else:
+        pdf.cell(0, 7, 'Assessment: Please complete your medical evaluation for detailed results.', 0, 1, 'L')
+    
+    pdf.ln(15)
+    
+    # Disclaimer
+    pdf.set_font(font, 'B', 12)
+    pdf.set_text_color(220, 53, 69)
+    pdf.cell(0, 8, 'IMPORTANT MEDICAL DISCLAIMER', 0, 1, 'C')
+    pdf.ln(5)
+    
+    pdf.set_font(font, '', 10)
+    pdf.set_text_color(0, 0, 0)
+    disclaimer_text = [
+        'This report is generated by MedMind AI for educational purposes only.',
+        'It is NOT a substitute for professional medical advice, diagnosis, or treatment.',
+        'Always consult with qualified healthcare professionals for medical concerns.'
+    ]
+    
+    for text in disclaimer_text:
+        pdf.cell(0, 6, text, 0, 1, 'C')
+    
+    if buffer is not None:
+        buffer.write(pdf.output())
+        return '.pdf'
+    
+    output_path = _output_path(output_stem, '.pdf')
+    try:
+        pdf.output(output_path)
+        return output_path
+    except Exception as e:
+        print(f"PDF output failed: {e}")
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        return None
+
+def create_text_report(name, age, gender, language, diagnosis, output_stem=None, buffer=None):
+    """Create text report as fallback"""
+    try:
+        content = f"""
+MEDMIND AI - MEDICAL ASSESSMENT REPORT
+====================================
+
+PATIENT INFORMATION:
+-------------------
+Name: {name}
+Age: {age} years
+Gender: {gender}
+Language: {language}
+Assessment Date: {datetime.now().strftime("%B %d, %Y")}
+Report Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
+
+MEDICAL ASSESSMENT RESULTS:
+--------------------------
+{diagnosis if diagnosis else 'Please complete your medical assessment in the chat for detailed results.'}
+
+IMPORTANT MEDICAL DISCLAIMER:
+----------------------------
+This report is generated by MedMind AI for educational purposes only.
+It is NOT a substitute for professional medical advice, diagnosis, or treatment.
+Always consult with qualified healthcare professionals for medical concerns.
+In case of medical emergency, contact your local emergency services immediately.
+
+MedMind AI - Your Digital Health Assistant
+Report ID: TXT-{datetime.now().strftime("%Y%m%d%H%M%S")}
+"""
+        
+        if buffer is not None:
+            buffer.write(content.encode('utf-8'))
+            return '.txt'
+        
+        output_path = _output_path(output_stem, '.txt')
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        return output_path
+        
+    except Exception as e:
+        print(f"Text report creation failed: {e}")
+        return None
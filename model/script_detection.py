@@ -0,0 +1,105 @@
+import re
+from collections import Counter, namedtuple
+
+# Unicode blocks are 128 codepoints wide, so codepoint >> 7 indexes this table
+SCRIPT_BLOCKS = {
+    0x0900 >> 7: 'hi',  # Devanagari (Hindi, Marathi)
+    0x0980 >> 7: 'bn',  # Bengali (Bengali, Assamese)
+    0x0A00 >> 7: 'pa',  # Gurmukhi
+    0x0A80 >> 7: 'gu',  # Gujarati
+    0x0B00 >> 7: 'or',  # Odia
+    0x0B80 >> 7: 'ta',  # Tamil
+    0x0C00 >> 7: 'te',  # Telugu
+    0x0C80 >> 7: 'kn',  # Kannada
+    0x0D00 >> 7: 'ml',  # Malayalam
+}
+
+# Letters that only (or mostly) occur in the second language sharing a script
+ASSAMESE_MARKERS = frozenset('ৰৱ')
+MARATHI_MARKERS = frozenset('ळ')
+MARATHI_WORDS = frozenset(['आहे', 'आहेत', 'मला', 'माझे', 'माझ्या', 'झाला', 'होत', 'नाही'])
+SHARED_SCRIPT = {'hi': 'mr', 'bn': 'as'}
+
+# Frequent words of romanized (Latin-script) Indic messages. Words that are
+# also common in English ('sir', 'pet', 'ho', 'se', 'tap', 'ache', ...) are
+# left out, or English symptom descriptions would read as Hindi/Marathi.
+ROMANIZED_WORDS = {
+    'hi': frozenset([
+        'mujhe', 'mera', 'meri', 'mere', 'hai', 'hain', 'nahi', 'nahin', 'dard', 'bukhar',
+        'khansi', 'kya', 'raha', 'rahi', 'bahut', 'thoda', 'mein', 'aur',
+        'gaya', 'gayi', 'ko', 'kal', 'takleef', 'dast', 'ulti'
+    ]),
+    'te': frozenset(['naaku', 'naku', 'undi', 'ledu', 'noppi', 'jwaram', 'chala', 'kadupu', 'tala']),
+    'ta': frozenset(['enakku', 'irukku', 'vali', 'kaaichal', 'romba', 'illai', 'thalai', 'vayiru']),
+    'bn': frozenset(['amar', 'byatha', 'jor', 'khub', 'matha', 'hocche']),
+    'mr': frozenset(['mala', 'aahe', 'ahe', 'dukhat', 'khup', 'nahi', 'doke'])
+}
+LATIN_WORD = re.compile(r'[a-z]+')
+
+SUPPORTED_CODES = ('en', 'hi', 'mr', 'bn', 'as', 'pa', 'gu', 'or', 'ta', 'te', 'kn', 'ml')
+
+LanguageDetection = namedtuple('LanguageDetection', ['language', 'distribution', 'romanized'])
+
+
+def _script_of(char):
+    code = ord(char)
+    if code < 0x80:
+        return 'en' if char.isalpha() else None
+    return SCRIPT_BLOCKS.get(code >> 7)
+
+
+def detect_language(text, preferred=None):
+    """Identify the language of text in one pass over its characters.
+
+    Returns LanguageDetection(language, distribution, romanized), where
+    distribution maps every supported language code to its share of the
+    script letters. preferred (a language code) breaks ties between
+    languages that share a script (Hindi/Marathi, Bengali/Assamese).
+    """
+    char_counts = Counter(text)  # the single pass; the rest works on distinct characters
+    counts = dict.fromkeys(SUPPORTED_CODES, 0)
+    for char, count in char_counts.items():
+        script = _script_of(char)
+        if script:
+            counts[script] += count
+
+    # Split shared scripts using marker letters or the session's preference
+    if counts['bn'] and (ASSAMESE_MARKERS.intersection(char_counts) or preferred == 'as'):
+        counts['as'], counts['bn'] = counts['bn'], 0
+    if counts['hi'] and (MARATHI_MARKERS.intersection(char_counts) or preferred == 'mr' or
+                         MARATHI_WORDS.intersection(text.split())):
+        counts['mr'], counts['hi'] = counts['hi'], 0
+
+    total = sum(counts.values())
+    if not total:
+        return LanguageDetection('en', {code: 0.0 for code in SUPPORTED_CODES}, False)
+    distribution = {code: count / total for code, count in counts.items()}
+    language = max(distribution, key=distribution.get)
+
+    romanized = False
+    if language == 'en':
+        romanized_language = detect_romanized_indic(text, preferred)
+        if romanized_language:
+            language, romanized = romanized_language, True
+
+    return LanguageDetection(language, distribution, romanized)
+
+
+def detect_romanized_indic(text, preferred=None, min_hits=2, min_share=0.25):
+    """Language code of romanized Indic text (e.g. "mujhe pet me dard hai"), else None
+
+    Needs min_hits distinct vocabulary words, so one repeated word that
+    happens to be English too doesn't decide the language.
+    """
+    words = LATIN_WORD.findall(text.lower())
+    if not words:
+        return None
+    distinct = set(words)
+    best, best_hits = None, 0
+    for code, vocabulary in ROMANIZED_WORDS.items():
+        hits = len(distinct & vocabulary)
+        if hits > best_hits or (hits == best_hits and hits and code == preferred):
+            best, best_hits = code, hits
+    if best_hits >= min_hits and best_hits / len(words) >= min_share:
+        return best
+    return None
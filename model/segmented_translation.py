@@ -0,0 +1,166 @@
+import functools
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Bullet / numbered-list markers are kept out of the text sent to the translator
+LINE_PATTERN = re.compile(r'^(\s*(?:(?:[-•*]|\d+[.)])\s+)?)(.*?)(\s*)$')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?।])\s+')
+
+
+def split_segments(text, max_chars=1500):
+    """Split markdown into structural pieces.
+
+    Returns a list of (prefix, core, suffix) tuples where only core needs
+    translating; prefix/suffix carry line breaks, indentation and list
+    markers so the result reassembles exactly. Lines longer than max_chars
+    are split further at sentence boundaries.
+    """
+    pieces = []
+    for part in re.split(r'(\n+)', text):
+        if not part.strip():
+            pieces.append((part, '', ''))
+            continue
+        prefix, core, suffix = LINE_PATTERN.match(part).groups()
+        if len(core) <= max_chars:
+            pieces.append((prefix, core, suffix))
+            continue
+        sentences = SENTENCE_BREAK.split(core)
+        chunk = ''
+        for sentence in sentences:
+            if chunk and len(chunk) + len(sentence) + 1 > max_chars:
+                pieces.append((prefix, chunk, ' '))
+                prefix, chunk = '', sentence
+            else:
+                chunk = f"{chunk} {sentence}" if chunk else sentence
+        pieces.append((prefix, chunk, suffix))
+    return pieces
+
+
+class SegmentedTranslator:
+    """Translate long text segment by segment on a bounded thread pool.
+
+    translate_segment(core) should raise on failure; each segment is retried
+    with backoff and then handed to fallback(core) on its own, so one bad
+    segment no longer sends the whole response to the fallback.
+    """
+
+    def __init__(self, max_workers=4, retries=2, backoff=0.5, history_size=50):
+        self.retries = retries
+        self.backoff = backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate-segment')
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=history_size)  # per-call segment timing reports
+        self.counters = {
+            'calls': 0,
+            'segments': 0,
+            'retries': 0,
+            'fallbacks': 0,
+            'failures': 0
+        }
+
+    def _run_segment(self, index, core, translate_segment, fallback):
+        start = time.perf_counter()
+        attempts = 0
+        status = 'ok'
+        translated = None
+        while attempts <= self.retries:
+            attempts += 1
+            try:
+                translated = translate_segment(core)
+                if translated:
+                    break
+            except Exception as e:
+                print(f"Segment {index} translation failed (attempt {attempts}): {e}")
+            if attempts <= self.retries:
+                time.sleep(self.backoff * (2 ** (attempts - 1)))
+
+        if not translated:
+            status = 'fallback'
+            try:
+                translated = fallback(core) if fallback else None
+            except Exception as e:
+                print(f"Segment {index} fallback failed: {e}")
+            if not translated:
+                status = 'failed'
+                translated = core
+
+        timing = {
+            'segment': index,
+            'chars': len(core),
+            'attempts': attempts,
+            'seconds': round(time.perf_counter() - start, 4),
+            'status': status
+        }
+        return translated, timing
+
+    def submit(self, text, translate_segment, fallback=None, max_chars=1500):
+        """Start translating text on the pool; returns a Future of (translated_text, timings)"""
+        start = time.perf_counter()
+        pieces = split_segments(text, max_chars)
+        indexes = [index for index, (_, core, _) in enumerate(pieces) if core]
+        results = {}
+        done = Future()
+        pending_lock = threading.Lock()
+
+        def finish():
+            output = []
+            timings = []
+            for index, (prefix, core, suffix) in enumerate(pieces):
+                if index in results:
+                    translated, timing = results[index]
+                    timings.append(timing)
+                    output.append(f"{prefix}{translated}{suffix}")
+                else:
+                    output.append(prefix)
+            self._record(timings, time.perf_counter() - start)
+            done.set_result((''.join(output), timings))
+
+        def segment_done(index, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                # _run_segment handles its own failures; this is a bug or a pool shutdown
+                with pending_lock:
+                    if not done.done():
+                        done.set_exception(e)
+                return
+            with pending_lock:
+                results[index] = result
+                complete = len(results) == len(indexes) and not done.done()
+            if complete:
+                finish()
+
+        if not indexes:
+            finish()
+        for index in indexes:
+            future = self._pool.submit(self._run_segment, index, pieces[index][1], translate_segment, fallback)
+            future.add_done_callback(functools.partial(segment_done, index))
+        return done
+
+    def translate(self, text, translate_segment, fallback=None, max_chars=1500):
+        """Translate text; returns (translated_text, per-segment timings)"""
+        return self.submit(text, translate_segment, fallback, max_chars).result()
+
+    def _record(self, timings, seconds):
+        with self._lock:
+            self.counters['calls'] += 1
+            self.counters['segments'] += len(timings)
+            for timing in timings:
+                self.counters['retries'] += timing['attempts'] - 1
+                if timing['status'] == 'fallback':
+                    self.counters['fallbacks'] += 1
+                elif timing['status'] == 'failed':
+                    self.counters['failures'] += 1
+            self.recent.append({
+                'segments': timings,
+                'total_seconds': round(seconds, 4)
+            })
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['last_call'] = self.recent[-1] if self.recent else None
+        return stats
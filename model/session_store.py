@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """Bounded per-session storage keyed by the Gradio session hash.
+
+    Sessions are kept in LRU order and evicted when the store exceeds
+    max_sessions or max_bytes (as measured by size_of), or when they have
+    been idle longer than idle_ttl seconds.
+    """
+
+    def __init__(self, max_sessions=1000, max_bytes=64 * 1024 * 1024, idle_ttl=3600, size_of=None):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.size_of = size_of or (lambda session: 0)
+        self._sessions = OrderedDict()  # session_id -> [session, size, last_access]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            'created': 0,
+            'evicted_lru': 0,
+            'evicted_memory': 0,
+            'expired': 0
+        }
+
+    def get(self, session_id):
+        """Session dict or None; refreshes its LRU position"""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[2] > self.idle_ttl:
+                self._drop(session_id, 'expired')
+                return None
+            entry[2] = now
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def get_or_create(self, session_id, factory=dict):
+        session = self.get(session_id)
+        if session is None:
+            session = factory()
+            with self._lock:
+                self.counters['created'] += 1
+            self.put(session_id, session)
+        return session
+
+    def put(self, session_id, session):
+        """Store (or re-measure after mutating) a session and enforce the caps"""
+        size = self.size_of(session)
+        now = time.time()
+        with self._lock:
+            old = self._sessions.pop(session_id, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._sessions[session_id] = [session, size, now]
+            self._total_bytes += size
+            self._enforce_limits(now)
+
+    def _drop(self, session_id, reason):
+        entry = self._sessions.pop(session_id)
+        self._total_bytes -= entry[1]
+        self.counters[reason] += 1
+
+    def _enforce_limits(self, now):
+        """Evict from the LRU end; caller holds the lock"""
+        # Idle sessions sit at the LRU end, so stop at the first fresh one
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest[2] <= self.idle_ttl:
+                break
+            self._drop(oldest_id, 'expired')
+        while len(self._sessions) > self.max_sessions:
+            self._drop(next(iter(self._sessions)), 'evicted_lru')
+        # Never evict the most recent session just to satisfy the byte budget
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            self._drop(next(iter(self._sessions)), 'evicted_memory')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['sessions'] = len(self._sessions)
+            stats['approx_bytes'] = self._total_bytes
+            stats['max_sessions'] = self.max_sessions
+            stats['max_bytes'] = self.max_bytes
+        return stats
@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import hashlib
+import threading
+
+
+def fingerprint(*parts):
+    """Stable key for an upstream request (e.g. 'gemini', prompt)"""
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical upstream calls.
+
+    The first caller for a key (the leader) makes the request; callers that
+    arrive while it is in flight wait and share its result or exception.
+    Nothing is kept once the call finishes, so this is not a cache.
+    do() is for threads, do_async() for coroutines on an event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}    # key -> _Call
+        self._futures = {}  # (event loop, key) -> asyncio.Future
+        self.counters = {
+            'upstream_calls': 0,
+            'coalesced': 0,
+            'shared_errors': 0
+        }
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counters['upstream_calls'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                with self._lock:
+                    self.counters['shared_errors'] += 1
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, coro_fn, *args):
+        """Await coro_fn(*args), sharing one upstream call with concurrent callers.
+
+        The call runs as its own task and every caller waits on it through
+        asyncio.shield, so a caller whose deadline passes (the leader too)
+        stops waiting without cancelling the call the others still wait for.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        with self._lock:
+            task = self._futures.get(flight_key)
+            leader = task is None
+            if leader:
+                task = self._futures[flight_key] = loop.create_task(coro_fn(*args))
+                task.add_done_callback(functools.partial(self._flight_done, flight_key))
+                self.counters['upstream_calls'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if not leader:
+                with self._lock:
+                    self.counters['shared_errors'] += 1
+            raise
+
+    def _flight_done(self, flight_key, task):
+        with self._lock:
+            if self._futures.get(flight_key) is task:
+                del self._futures[flight_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller stopped waiting
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['in_flight'] = len(self._calls) + len(self._futures)
+        return stats
@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Inline <style> blocks and classic inline <script> blocks (no src, no special type)
+INLINE_STYLE = re.compile(r'<style>(.*?)</style>', re.DOTALL | re.IGNORECASE)
+INLINE_SCRIPT = re.compile(r'<script>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+
+PAGE_CACHE_CONTROL = 'no-cache'  # always revalidate - the ETag makes that a 304
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MIN_COMPRESS_BYTES = 512
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def compressed_variants(data):
+    """{'identity': bytes, 'gzip': bytes, 'br': bytes} - encodings that actually save space"""
+    variants = {'identity': data}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return variants
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gzipped) < len(data):
+        variants['gzip'] = gzipped
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            variants['br'] = compressed
+    return variants
+
+
+def choose_encoding(accept_encoding, available):
+    """Smallest acceptable encoding from an Accept-Encoding header"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    candidates = [
+        coding for coding in available
+        if coding != 'identity' and accepted.get(coding, accepted.get('*', 0)) > 0
+    ]
+    if not candidates:
+        return 'identity'
+    return min(candidates, key=lambda coding: len(available[coding]))
+
+
+class StaticEntry:
+    __slots__ = ('mimetype', 'variants', 'etag', 'cache_control')
+
+    def __init__(self, data, mimetype, cache_control):
+        self.mimetype = mimetype
+        self.variants = compressed_variants(data)
+        self.etag = _digest(data)[:32]
+        self.cache_control = cache_control
+
+    def etag_for(self, encoding):
+        # Each encoding is a different representation, so it gets its own strong ETag
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+
+class StaticPages:
+    """Pages rendered once, with inline CSS/JS moved into fingerprinted assets.
+
+    Every page and asset is kept in memory as identity, gzip and (when the
+    brotli package is installed) brotli bodies.
+    """
+
+    def __init__(self, asset_prefix='/assets/'):
+        self.asset_prefix = asset_prefix
+        self.pages = {}
+        self.assets = {}
+        self._lock = threading.Lock()
+
+    def _add_asset(self, content, extension, mimetype):
+        data = content.strip().encode('utf-8')
+        name = f"{_digest(data)[:12]}.{extension}"
+        if name not in self.assets:
+            self.assets[name] = StaticEntry(data, mimetype, ASSET_CACHE_CONTROL)
+        return f"{self.asset_prefix}{name}"
+
+    def extract_assets(self, html):
+        """Replace inline <style>/<script> blocks with links to fingerprinted assets"""
+        html = INLINE_STYLE.sub(
+            lambda match: f'<link rel="stylesheet" href="{self._add_asset(match.group(1), "css", "text/css; charset=utf-8")}">',
+            html
+        )
+        return INLINE_SCRIPT.sub(
+            lambda match: f'<script src="{self._add_asset(match.group(1), "js", "text/javascript; charset=utf-8")}"></script>',
+            html
+        )
+
+    def build(self, render, pages):
+        """render(template) -> html for each {page: template}; returns total bytes per encoding"""
+        with self._lock:
+            for page, template in pages.items():
+                html = self.extract_assets(render(template))
+                self.pages[page] = StaticEntry(html.encode('utf-8'), 'text/html; charset=utf-8', PAGE_CACHE_CONTROL)
+        totals = {}
+        for entry in list(self.pages.values()) + list(self.assets.values()):
+            for encoding, body in entry.variants.items():
+                totals[encoding] = totals.get(encoding, 0) + len(body)
+        return totals
+
+    def lookup(self, entry, accept_encoding, if_none_match=None):
+        """(status, headers, body) for a page or asset entry"""
+        encoding = choose_encoding(accept_encoding, entry.variants)
+        etag = entry.etag_for(encoding)
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': entry.cache_control,
+            'Vary': 'Accept-Encoding',
+            'Content-Type': entry.mimetype
+        }
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        if if_none_match is not None and if_none_match.contains_weak(etag):
+            return 304, headers, b''
+        return 200, headers, entry.variants[encoding]
@@ -0,0 +1,138 @@
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from symptom_classifier import FILLER_WORDS, normalize_symptom_text
+
+try:
+    from fuzzywuzzy import fuzz
+except ImportError:
+    fuzz = None
+
+
+def cache_key(text):
+    """Normalize case, punctuation, whitespace and Unicode forms; drop filler words"""
+    words = normalize_symptom_text(text).split()
+    meaningful = [word for word in words if word not in FILLER_WORDS]
+    return ' '.join(meaningful or words)
+
+
+def token_sort_ratio(a, b):
+    """0-100 Levenshtein-style similarity of the sorted tokens"""
+    sorted_a, sorted_b = ' '.join(sorted(a.split())), ' '.join(sorted(b.split()))
+    if fuzz is not None:
+        return fuzz.ratio(sorted_a, sorted_b)
+    return round(100 * SequenceMatcher(None, sorted_a, sorted_b).ratio())
+
+
+def token_set_ratio(a, b):
+    """0-100 token-set similarity (fuzzywuzzy when installed, difflib otherwise)"""
+    if fuzz is not None:
+        return fuzz.token_set_ratio(a, b)
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    common = ' '.join(sorted(tokens_a & tokens_b))
+    combined_a = f"{common} {' '.join(sorted(tokens_a - tokens_b))}".strip()
+    combined_b = f"{common} {' '.join(sorted(tokens_b - tokens_a))}".strip()
+    return round(100 * max(
+        SequenceMatcher(None, common, combined_a).ratio() if common else 0,
+        SequenceMatcher(None, common, combined_b).ratio() if common else 0,
+        SequenceMatcher(None, combined_a, combined_b).ratio()
+    ))
+
+
+class SymptomDetectionCache:
+    """Exact + near-duplicate cache of symptom classification results.
+
+    Exact hits come from a hash map on the normalized text. Near-duplicates
+    are looked up through an inverted token index and accepted when their
+    token-set similarity reaches min_similarity and their sorted-token edit
+    similarity reaches min_edit_similarity (both 0-100). The second check
+    stops a bare "pain" from matching a cached "stomach pain", which
+    token-set similarity alone scores as identical.
+    """
+
+    def __init__(self, max_entries=5000, min_similarity=90, min_edit_similarity=80, max_candidates=200):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.min_edit_similarity = min_edit_similarity
+        self.max_candidates = max_candidates
+        self._entries = OrderedDict()  # normalized key -> value
+        self._token_index = {}         # token -> set of keys containing it
+        self._lock = threading.Lock()
+        self.counters = {
+            'exact_hits': 0,
+            'fuzzy_hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    def get(self, text):
+        key = cache_key(text)
+        if not key:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.counters['exact_hits'] += 1
+                return value
+
+            best_key, best_score = None, 0
+            for candidate in self._candidates(key):
+                if token_set_ratio(key, candidate) < self.min_similarity:
+                    continue
+                score = token_sort_ratio(key, candidate)
+                if score > best_score:
+                    best_key, best_score = candidate, score
+            if best_key is not None and best_score >= self.min_edit_similarity:
+                self._entries.move_to_end(best_key)
+                self.counters['fuzzy_hits'] += 1
+                return self._entries[best_key]
+
+            self.counters['misses'] += 1
+            return None
+
+    def _candidates(self, key):
+        """Cached keys sharing a token with key, rarest tokens first; caller holds the lock"""
+        postings = sorted(
+            (self._token_index[token] for token in set(key.split()) if token in self._token_index),
+            key=len
+        )
+        seen = set()
+        for keys in postings:
+            for candidate in keys:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+                    if len(seen) >= self.max_candidates:
+                        return
+
+    def put(self, text, value):
+        key = cache_key(text)
+        if not key:
+            return
+        with self._lock:
+            if key not in self._entries:
+                for token in set(key.split()):
+                    self._token_index.setdefault(token, set()).add(key)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                for token in set(old_key.split()):
+                    keys = self._token_index.get(token)
+                    if keys is not None:
+                        keys.discard(old_key)
+                        if not keys:
+                            del self._token_index[token]
+                self.counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['min_similarity'] = self.min_similarity
+            stats['min_edit_similarity'] = self.min_edit_similarity
+        lookups = stats['exact_hits'] + stats['fuzzy_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['exact_hits'] + stats['fuzzy_hits']) / lookups, 3) if lookups else 0.0
+        return stats
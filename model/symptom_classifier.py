@@ -0,0 +1,397 @@
+import unicodedata
+
+import numpy as np
+
+# Multilingual synonym lexicon (English, romanized Hindi and the main Indic scripts)
+SYMPTOM_SYNONYMS = {
+    # === DIGESTIVE SYSTEM ===
+    'stomach_pain': [
+        'stomach ache', 'stomachache', 'tummy ache', 'belly pain', 'abdominal pain',
+        'pain in stomach', 'pet dard', 'pet me dard', 'पेट दर्द', 'पेट में दर्द',
+        'కడుపు నొప్పి', 'வயிற்று வலி', 'পেটে ব্যথা', 'પેટમાં દુખાવો', 'ಹೊಟ್ಟೆ ನೋವು',
+        'വയറുവേദന', 'पोटदुखी', 'ਪੇਟ ਦਰਦ'
+    ],
+    'nausea': [
+        'nauseous', 'feel like vomiting', 'queasy', 'ji machlana', 'जी मिचलाना',
+        'मतली', 'వికారం', 'குமட்டல்', 'বমি বমি ভাব', 'ઉબકા'
+    ],
+    'vomiting': [
+        'vomit', 'throwing up', 'puking', 'ulti', 'उल्टी', 'वमन', 'వాంతులు',
+        'வாந்தி', 'বমি', 'ઉલટી', 'ವಾಂತಿ', 'ഛർദ്ദി'
+    ],
+    'diarrhea': [
+        'diarrhoea', 'loose motion', 'loose motions', 'loose stools', 'watery stool',
+        'dast', 'दस्त', 'విరేచనాలు', 'வயிற்றுப்போக்கு', 'ডায়রিয়া', 'ঝাড়া', 'ઝાડા'
+    ],
+    'constipation': [
+        'cannot pass stool', 'hard stool', 'kabj', 'kabz', 'कब्ज', 'మలబద్ధకం',
+        'மலச்சிக்கல்', 'কোষ্ঠকাঠিন্য', 'કબજિયાત'
+    ],
+    'heartburn': ['burning in chest after eating', 'seene me jalan', 'सीने में जलन', 'గుండెల్లో మంట'],
+    'bloating': ['bloated', 'swollen belly', 'pet phoolna', 'पेट फूलना', 'కడుపు ఉబ్బరం'],
+    'loss_of_appetite': ['no appetite', 'not hungry', 'bhookh nahi', 'भूख नहीं', 'भूख न लगना', 'ఆకలి లేదు'],
+    'abdominal_cramps': ['stomach cramps', 'belly cramps', 'pet me marod', 'पेट में मरोड़'],
+    'indigestion': ['upset stomach', 'dyspepsia', 'badhazmi', 'अपच', 'बदहजमी', 'అజీర్ణం'],
+    'acid_reflux': ['acidity', 'gerd', 'sour burps', 'khatti dakar', 'एसिडिटी', 'खट्टी डकार', 'ఎసిడిటీ'],
+    'stomach_ulcer': ['gastric ulcer', 'ulcer in stomach', 'पेट का अल्सर'],
+    'gas_problems': ['gas', 'flatulence', 'farting', 'burping', 'gas problem', 'गैस', 'గ్యాస్'],
+    'food_poisoning': ['ate bad food', 'spoiled food', 'food infection', 'फूड पॉइजनिंग'],
+    'gallbladder_pain': ['gallstones', 'gall bladder pain', 'pitt ki thaili', 'पित्ताशय'],
+    'liver_problems': ['jaundice', 'yellow eyes', 'yellow skin', 'piliya', 'पीलिया', 'కామెర్లు', 'மஞ்சள் காமாலை'],
+    'hemorrhoids': ['piles', 'bleeding while passing stool', 'bawaseer', 'बवासीर', 'మొలలు'],
+    'irritable_bowel': ['ibs', 'irritable bowel syndrome'],
+    'peptic_ulcer': ['duodenal ulcer', 'ulcer pain'],
+    'gastroenteritis': ['stomach flu', 'stomach bug', 'stomach infection', 'पेट का संक्रमण'],
+
+    # === RESPIRATORY SYSTEM ===
+    'cough': [
+        'coughing', 'dry cough', 'wet cough', 'khansi', 'khasi', 'खांसी', 'खाँसी',
+        'దగ్గు', 'இருமல்', 'কাশি', 'ખાંસી', 'ಕೆಮ್ಮು', 'ചുമ', 'खोकला', 'ਖੰਘ'
+    ],
+    'shortness_of_breath': [
+        'breathless', 'breathlessness', 'cannot breathe', 'difficulty breathing',
+        'trouble breathing', 'saans lene me takleef', 'सांस लेने में तकलीफ',
+        'सांस फूलना', 'ఊపిరి ఆడటం లేదు', 'மூச்சுத் திணறல்', 'শ্বাসকষ্ট', 'શ્વાસ'
+    ],
+    'wheezing': ['whistling breath', 'whistling sound when breathing', 'सीटी जैसी सांस'],
+    'chest_congestion': ['phlegm in chest', 'mucus in chest', 'chest cold', 'balgam', 'बलगम', 'कफ'],
+    'runny_nose': ['running nose', 'nose running', 'naak behna', 'नाक बहना', 'ముక్కు కారడం', 'சளி'],
+    'stuffy_nose': ['blocked nose', 'nasal congestion', 'naak band', 'नाक बंद', 'ముక్కు దిబ్బడ'],
+    'sneezing': ['sneeze', 'chheenk', 'छींक', 'తుమ్ములు', 'தும்மல்', 'হাঁচি'],
+    'sinus_pressure': ['sinus', 'sinusitis', 'pressure in face'],
+    'pneumonia_symptoms': ['pneumonia', 'lung infection', 'निमोनिया'],
+    'bronchitis': ['bronchial infection', 'chest infection'],
+    'asthma_attack': ['asthma', 'inhaler', 'dama', 'दमा', 'अस्थमा', 'ఆస్తమా'],
+    'allergic_rhinitis': ['hay fever', 'dust allergy', 'nasal allergy', 'एलर्जी'],
+    'hiccups': ['hiccup', 'hichki', 'हिचकी', 'ఎక్కిళ్ళు'],
+    'laryngitis': ['lost my voice', 'hoarse voice', 'hoarseness', 'awaz baith gayi', 'आवाज बैठ गई'],
+    'sleep_apnea': ['snoring', 'stop breathing while sleeping', 'खर्राटे'],
+
+    # === CARDIOVASCULAR SYSTEM ===
+    'chest_pain': [
+        'pain in chest', 'chest tightness', 'seene me dard', 'सीने में दर्द', 'छाती में दर्द',
+        'ఛాతీ నొప్పి', 'நெஞ்சு வலி', 'বুকে ব্যথা', 'છાતીમાં દુખાવો'
+    ],
+    'heart_palpitations': ['palpitations', 'heart pounding', 'dhadkan', 'धड़कन', 'दिल की धड़कन'],
+    'high_blood_pressure': ['hypertension', 'high bp', 'bp high', 'हाई बीपी', 'उच्च रक्तचाप', 'బీపీ'],
+    'swelling': ['swollen legs', 'swollen feet', 'edema', 'oedema', 'sujan', 'सूजन', 'వాపు', 'வீக்கம்'],
+    'irregular_heartbeat': ['arrhythmia', 'skipped heartbeat', 'uneven heartbeat'],
+    'low_blood_pressure': ['hypotension', 'low bp', 'bp low', 'लो बीपी'],
+    'rapid_heartbeat': ['fast heartbeat', 'racing heart', 'tachycardia', 'तेज धड़कन'],
+    'slow_heartbeat': ['bradycardia', 'slow pulse'],
+    'varicose_veins': ['bulging veins', 'swollen veins', 'spider veins'],
+    'blood_clot': ['clot', 'dvt', 'deep vein thrombosis', 'thrombosis'],
+    'heart_murmur': ['murmur', 'abnormal heart sound'],
+    'angina': ['chest pain on exertion', 'chest pressure when walking'],
+
+    # === NEUROLOGICAL SYSTEM ===
+    'headache': [
+        'head ache', 'head pain', 'head is paining', 'sir dard', 'sar dard', 'सिर दर्द',
+        'सिरदर्द', 'తల నొప్పి', 'తలనొప్పి', 'தலைவலி', 'মাথা ব্যথা', 'মাথাব্যথা',
+        'માથાનો દુખાવો', 'ತಲೆನೋವು', 'തലവേദന', 'डोकेदुखी', 'ਸਿਰ ਦਰਦ'
+    ],
+    'dizziness': [
+        'dizzy', 'lightheaded', 'vertigo', 'head spinning', 'chakkar', 'चक्कर',
+        'చక్కర్లు', 'తల తిరగడం', 'தலைச்சுற்றல்', 'মাথা ঘোরা'
+    ],
+    'migraine': ['migraine headache', 'one sided headache', 'आधासीसी', 'माइग्रेन'],
+    'memory_problems': ['forgetful', 'forgetting things', 'memory loss', 'bhoolna', 'भूलने की बीमारी'],
+    'numbness': ['numb', 'pins and needles', 'tingling', 'sunnpan', 'सुन्नपन', 'झुनझुनी', 'తిమ్మిరి'],
+    'seizure': ['fits', 'convulsions', 'epilepsy', 'mirgi', 'मिर्गी', 'दौरा', 'ఫిట్స్'],
+    'confusion': ['confused', 'disoriented', 'not thinking clearly'],
+    'coordination_problems': ['clumsy', 'poor coordination', 'uncoordinated'],
+    'tremor': ['shaking hands', 'trembling', 'hands shaking', 'कांपना'],
+    'weakness': ['weak', 'feeling weak', 'kamzori', 'कमजोरी', 'నీరసం', 'பலவீனம்', 'দুর্বলতা'],
+    'fainting': ['fainted', 'passed out', 'blackout', 'behosh', 'बेहोश', 'மயக்கம்'],
+    'vision_problems': ['vision problem', 'cannot see properly', 'eyesight problem'],
+    'speech_problems': ['slurred speech', 'difficulty speaking', 'stammering'],
+    'balance_problems': ['losing balance', 'unsteady', 'falling down'],
+    'cognitive_decline': ['dementia', 'alzheimer'],
+    'stroke_symptoms': ['stroke', 'face drooping', 'paralysis', 'lakwa', 'लकवा', 'పక్షవాతం'],
+    'nerve_pain': ['sciatica', 'shooting pain', 'neuropathy', 'nas me dard', 'नस में दर्द'],
+    'concussion': ['head injury', 'hit my head', 'sir me chot', 'सिर में चोट'],
+
+    # === MUSCULOSKELETAL SYSTEM ===
+    'back_pain': [
+        'backache', 'lower back pain', 'kamar dard', 'kamar me dard', 'कमर दर्द',
+        'पीठ दर्द', 'నడుము నొప్పి', 'முதுகு வலி', 'কোমর ব্যথা', 'পিঠে ব্যথা'
+    ],
+    'neck_pain': ['stiff neck', 'gardan dard', 'गर्दन दर्द', 'गर्दन में दर्द', 'మెడ నొప్పి', 'கழுத்து வலி'],
+    'joint_pain': ['joints aching', 'jodo me dard', 'जोड़ों में दर्द', 'కీళ్ల నొప్పులు', 'மூட்டு வலி', 'গাঁটে ব্যথা'],
+    'muscle_pain': ['muscle ache', 'sore muscles', 'myalgia', 'मांसपेशियों में दर्द', 'కండరాల నొప్పి'],
+    'arthritis': ['gathiya', 'गठिया', 'rheumatoid', 'osteoarthritis'],
+    'muscle_cramps': ['cramp in leg', 'leg cramps', 'charley horse', 'ainthan', 'ऐंठन'],
+    'stiffness': ['stiff joints', 'stiff body', 'jakdan', 'जकड़न'],
+    'muscle_weakness': ['weak muscles', 'muscles feel weak'],
+    'bone_pain': ['pain in bones', 'haddi me dard', 'हड्डी में दर्द', 'ఎముకల నొప్పి'],
+    'tendon_pain': ['tendonitis', 'tendinitis'],
+    'ligament_injury': ['sprain', 'sprained ankle', 'twisted ankle', 'moch', 'मोच'],
+    'fracture_symptoms': ['fracture', 'broken bone', 'haddi tootna', 'हड्डी टूटना'],
+    'spinal_problems': ['spine problem', 'slipped disc', 'herniated disc', 'रीढ़'],
+    'shoulder_pain': ['frozen shoulder', 'kandhe me dard', 'कंधे में दर्द', 'భుజం నొప్పి', 'தோள்பட்டை வலி'],
+    'knee_pain': ['knee ache', 'ghutne me dard', 'घुटने में दर्द', 'మోకాలి నొప్పి', 'முழங்கால் வலி', 'হাঁটুতে ব্যথা'],
+
+    # === GENERAL/CONSTITUTIONAL ===
+    'fatigue': [
+        'tired', 'tiredness', 'exhausted', 'exhaustion', 'feel very tired', 'thakan',
+        'थकान', 'थकावट', 'అలసట', 'சோர்வு', 'ক্লান্তি', 'થાક', 'ಆಯಾಸ', 'ക്ഷീണം'
+    ],
+    'fever': [
+        'feverish', 'high temperature', 'temperature', 'bukhar', 'bukhaar', 'बुखार',
+        'ज्वर', 'జ్వరం', 'காய்ச்சல்', 'জ্বর', 'તાવ', 'ಜ್ವರ', 'പനി', 'ताप', 'ਬੁਖਾਰ'
+    ],
+    'weight_loss': ['losing weight', 'lost weight', 'vajan kam', 'वजन कम', 'బరువు తగ్గడం'],
+    'weight_gain': ['gaining weight', 'put on weight', 'vajan badh', 'वजन बढ़', 'మోటాపా'],
+    'night_sweats': ['sweating at night', 'raat ko paseena', 'रात को पसीना'],
+    'chills': ['shivering', 'feeling cold', 'kapkapi', 'कंपकंपी', 'ठंड लगना', 'చలి'],
+    'malaise': ['unwell', 'not feeling well', 'feeling sick', 'तबीयत ठीक नहीं'],
+    'body_aches': ['body ache', 'body pain', 'whole body pain', 'badan dard', 'बदन दर्द', 'शरीर में दर्द', 'ఒళ్ళు నొప్పులు', 'உடல் வலி', 'গা ব্যথা'],
+    'dehydration': ['dehydrated', 'very thirsty', 'pani ki kami', 'पानी की कमी'],
+    'loss_of_energy': ['no energy', 'low energy', 'lethargic', 'sust', 'सुस्ती'],
+    'insomnia': ['cannot sleep', "can't sleep", 'sleeplessness', 'neend nahi', 'नींद नहीं आती', 'अनिद्रा', 'నిద్రలేమి', 'தூக்கமின்மை'],
+    'excessive_sweating': ['sweating a lot', 'hyperhidrosis', 'bahut paseena', 'बहुत पसीना'],
+
+    # === SKIN & DERMATOLOGICAL ===
+    'rash': [
+        'skin rash', 'rashes', 'red spots', 'hives', 'chakatte', 'चकत्ते', 'दाने',
+        'దద్దుర్లు', 'தடிப்பு', 'ফুসকুড়ি', 'ચકામા'
+    ],
+    'itching': ['itchy', 'itchy skin', 'khujli', 'खुजली', 'దురద', 'அரிப்பு', 'চুলকানি', 'ખંજવાળ'],
+    'hair_loss': ['hair fall', 'hair falling', 'baldness', 'baal jhadna', 'बाल झड़ना', 'జుట్టు రాలడం', 'முடி உதிர்தல்'],
+    'skin_changes': ['mole', 'skin discoloration', 'dark patches', 'white patches'],
+    'acne': ['pimples', 'zits', 'muhase', 'मुंहासे', 'మొటిమలు', 'பருக்கள்', 'ব্রণ'],
+    'dry_skin': ['skin dryness', 'flaky skin', 'rukhi twacha', 'रूखी त्वचा'],
+    'oily_skin': ['greasy skin', 'oily face', 'तैलीय त्वचा'],
+    'wounds_healing': ['wound not healing', 'cut not healing', 'ghav', 'घाव', 'గాయం'],
+    'burns': ['burn', 'burnt', 'scald', 'jal gaya', 'जल गया', 'కాలిన గాయం'],
+    'bruising': ['bruise', 'bruises', 'blue marks', 'neel', 'नील'],
+
+    # === EYES & VISION ===
+    'eye_pain': ['pain in eye', 'eyes hurt', 'aankh me dard', 'आंख में दर्द', 'आँख में दर्द', 'కంటి నొప్పి', 'கண் வலி'],
+    'blurry_vision': ['blurred vision', 'blurry eyes', 'dhundhla dikhna', 'धुंधला दिखना'],
+    'double_vision': ['seeing double', 'diplopia'],
+    'eye_discharge': ['pink eye', 'conjunctivitis', 'sticky eyes', 'red eye', 'aankh aana', 'आंख आना'],
+    'light_sensitivity': ['photophobia', 'light hurts eyes', 'sensitive to light'],
+
+    # === EARS & HEARING ===
+    'ear_pain': ['earache', 'ear ache', 'kaan me dard', 'कान में दर्द', 'చెవి నొప్పి', 'காது வலி', 'কানে ব্যথা'],
+    'hearing_loss': ['cannot hear', 'hard of hearing', 'deafness', 'kam sunai', 'कम सुनाई'],
+    'ear_ringing': ['tinnitus', 'ringing in ears', 'buzzing in ears', 'कान में आवाज'],
+    'ear_discharge': ['pus from ear', 'fluid from ear', 'kaan behna', 'कान बहना'],
+    'ear_pressure': ['blocked ear', 'ears feel full', 'ear blocked'],
+
+    # === THROAT & MOUTH ===
+    'sore_throat': [
+        'throat pain', 'throat hurts', 'painful swallowing', 'gale me dard', 'gala kharab',
+        'गले में दर्द', 'गला खराब', 'గొంతు నొప్పి', 'தொண்டை வலி', 'গলা ব্যথা', 'ગળામાં દુખાવો'
+    ],
+    'mouth_sores': ['mouth ulcer', 'mouth ulcers', 'canker sore', 'chhale', 'मुंह के छाले', 'నోటి పుండ్లు'],
+    'bad_breath': ['halitosis', 'smelly breath', 'muh se badbu', 'मुंह से बदबू'],
+    'dry_mouth': ['mouth feels dry', 'xerostomia', 'muh sukhna', 'मुंह सूखना'],
+    'swollen_glands': ['swollen lymph nodes', 'lump in neck', 'gland swelling', 'गांठ'],
+
+    # === GENITOURINARY SYSTEM ===
+    'urinary_problems': ['frequent urination', 'peshab', 'पेशाब', 'మూత్రం', 'சிறுநீர்'],
+    'kidney_pain': ['kidney stone', 'flank pain', 'pathri', 'पथरी', 'गुर्दे में दर्द', 'కిడ్నీ నొప్పి'],
+    'bladder_problems': ['overactive bladder', 'bladder pain'],
+    'prostate_problems': ['prostate', 'weak urine stream'],
+    'menstrual_problems': [
+        'period pain', 'periods', 'irregular periods', 'menstrual cramps', 'heavy bleeding',
+        'mahavari', 'माहवारी', 'मासिक धर्म', 'पीरियड्स', 'నెలసరి', 'மாதவிடாய்', 'মাসিক'
+    ],
+    'sexual_health': ['sexual problem', 'low libido'],
+    'pelvic_pain': ['pain in pelvis', 'lower abdomen pain in women', 'पेडू में दर्द'],
+    'uti_symptoms': ['uti', 'burning urination', 'burning while urinating', 'peshab me jalan', 'पेशाब में जलन', 'urine infection'],
+    'incontinence': ['leaking urine', 'cannot control urine', 'bedwetting'],
+    'erectile_dysfunction': ['impotence', 'erection problem'],
+
+    # === MENTAL HEALTH ===
+    'anxiety': ['anxious', 'worried all the time', 'nervous', 'ghabrahat', 'घबराहट', 'चिंता', 'ఆందోళన', 'பதட்டம்', 'উদ্বেগ'],
+    'depression': ['depressed', 'feeling sad', 'hopeless', 'udaas', 'उदास', 'अवसाद', 'డిప్రెషన్', 'மனச்சோர்வு', 'বিষণ্ণতা'],
+    'mood_swings': ['moody', 'mood changes', 'irritable'],
+    'stress': ['stressed', 'tension', 'pressure at work', 'तनाव', 'టెన్షన్', 'மன அழுத்தம்'],
+    'panic_attacks': ['panic attack', 'sudden fear', 'panic'],
+    'sleep_disorders': ['sleep problem', 'sleeping too much', 'nightmares', 'sleepwalking'],
+    'concentration_problems': ['cannot concentrate', 'cannot focus', 'poor focus', 'distracted']
+}
+
+# Synonym words this short ('gas', 'uti', 'burn', 'pet') only count as whole words
+SHORT_WORD_CHARS = 4
+
+# Words that say nothing about the category: first person, time and intensity
+# fillers (English and romanized Hindi). Words used in the question bank of
+# GENERIC_WORD_SHARE of the categories ('pain', 'have', 'how') are added at index time.
+# symptom_cache.py drops the same words from its cache keys.
+FILLER_WORDS = {
+    'i', 'im', 'ive', 'me', 'my', 'mine', 'am', 'is', 'are', 'was', 'been', 'have', 'has', 'having', 'had',
+    'feel', 'feeling', 'a', 'an', 'the', 'this', 'of', 'and', 'but', 'so', 'very', 'really', 'severe', 'mild',
+    'lot', 'lots', 'bit', 'little', 'bad', 'badly', 'too', 'got', 'get', 'getting', 'since', 'for', 'from',
+    'today', 'yesterday', 'tonight', 'morning', 'evening', 'night', 'last', 'week', 'weeks', 'day', 'days', 'hours',
+    'two', 'three', 'few', 'some', 'still', 'again', 'always', 'keep', 'keeps', 'all', 'time', 'now',
+    'hurt', 'hurts', 'hurting', 'ache', 'aches', 'aching', 'please', 'help', 'doctor',
+    'mujhe', 'mera', 'meri', 'mere', 'hai', 'hain', 'ho', 'raha', 'rahi', 'rahe', 'me', 'mein', 'se', 'ka', 'ki',
+    'ke', 'bahut', 'hua', 'hui', 'kal', 'aaj'
+}
+GENERIC_WORD_SHARE = 0.15
+# A query word counts as explained by a category when this share of its n-grams is in the category's phrases
+WORD_MATCH_SHARE = 0.6
+
+
+def normalize_symptom_text(text):
+    """Casefold and keep only letters, marks and digits (Indic vowel signs are marks)"""
+    text = unicodedata.normalize('NFKC', str(text)).casefold().replace('_', ' ')
+    cleaned = ''.join(
+        char if unicodedata.category(char)[0] in 'LMN' else ' '
+        for char in text
+    )
+    return ' '.join(cleaned.split())
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of each word, padded so word boundaries are part of the gram"""
+    grams = set()
+    for word in normalize_symptom_text(text).split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams.add(padded)
+            continue
+        for i in range(len(padded) - n + 1):
+            grams.add(padded[i:i + n])
+    return grams
+
+
+class SymptomClassifier:
+    """Offline TF-IDF character n-gram matcher over SYMPTOM_QUESTIONS categories.
+
+    Every category is represented by prototype phrases (its key plus the synonym
+    lexicon). A query scores each prototype by the IDF-weighted share of the
+    prototype's n-grams it contains; the question bank only feeds the IDF so that
+    generic words like "pain" or "how long" carry little weight.
+
+    Short synonym words must appear as whole words ("uti" does not match
+    "utility"), and the confidence is scaled by the share of the query's content
+    words the winning category explains, so "I am coughing blood" is not a
+    confident "cough".
+    """
+
+    def __init__(self, symptom_questions, synonyms=None, ngram_size=3):
+        self.ngram_size = ngram_size
+        self.categories = list(symptom_questions.keys())
+        synonyms = SYMPTOM_SYNONYMS if synonyms is None else synonyms
+
+        # Prototype phrases, grouped by category so reduceat can take a per-category max
+        # Words that carry no category information
+        word_doc_freq = {}
+        for category in self.categories:
+            for word in {word for question in symptom_questions[category] for word in normalize_symptom_text(question).split()}:
+                word_doc_freq[word] = word_doc_freq.get(word, 0) + 1
+        self._generic_words = FILLER_WORDS | {
+            word for word, count in word_doc_freq.items() if count >= GENERIC_WORD_SHARE * len(self.categories)
+        }
+
+        prototypes = []
+        prototype_category = []
+        self._required_words = []  # (prototype index, short words that must appear whole)
+        self._category_words = []  # per category: words and n-grams of its phrases
+        for cat_index, category in enumerate(self.categories):
+            words, grams_union = set(), set()
+            for phrase in [category] + list(synonyms.get(category, [])):
+                grams = char_ngrams(phrase, ngram_size)
+                if grams:
+                    phrase_words = set(normalize_symptom_text(phrase).split())
+                    required = frozenset(
+                        word for word in phrase_words
+                        if len(word) <= SHORT_WORD_CHARS and word not in self._generic_words
+                    )
+                    if required:
+                        self._required_words.append((len(prototypes), required))
+                    prototypes.append(grams)
+                    prototype_category.append(cat_index)
+                    words |= phrase_words
+                    grams_union |= grams
+            self._category_words.append((words, grams_union))
+        self._category_starts = np.searchsorted(
+            np.asarray(prototype_category), np.arange(len(self.categories))
+        )
+
+        # IDF over one document per category: key, synonyms and the whole question bank
+        doc_freq = {}
+        for category in self.categories:
+            document = set()
+            for phrase in [category] + list(synonyms.get(category, [])) + list(symptom_questions[category]):
+                document |= char_ngrams(phrase, ngram_size)
+            for gram in document:
+                doc_freq[gram] = doc_freq.get(gram, 0) + 1
+        n_docs = len(self.categories)
+
+        # CSR layout indexed by n-gram: which prototypes contain it and with what weight
+        postings = {}
+        for proto_index, grams in enumerate(prototypes):
+            idf = {gram: np.log((1 + n_docs) / (1 + doc_freq.get(gram, 0))) + 1.0 for gram in grams}
+            total = sum(idf.values())
+            for gram, weight in idf.items():
+                postings.setdefault(gram, []).append((proto_index, weight / total))
+
+        self._vocab = {}
+        offsets = [0]
+        indices = []
+        weights = []
+        for gram, entries in postings.items():
+            self._vocab[gram] = len(offsets) - 1
+            for proto_index, weight in entries:
+                indices.append(proto_index)
+                weights.append(weight)
+            offsets.append(len(indices))
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._indices = np.asarray(indices, dtype=np.int64)
+        self._weights = np.asarray(weights, dtype=np.float64)
+        self._n_prototypes = len(prototypes)
+
+    def scores(self, text):
+        """Per-category containment score in [0, 1]"""
+        query_words = set(normalize_symptom_text(text).split())
+        rows = [self._vocab[gram] for gram in char_ngrams(text, self.ngram_size) if gram in self._vocab]
+        if not rows:
+            return np.zeros(len(self.categories))
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self._offsets[rows]
+        lengths = self._offsets[rows + 1] - starts
+        # Gather every posting of the query n-grams in one vectorized step
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        prototype_scores = np.bincount(
+            self._indices[positions],
+            weights=self._weights[positions],
+            minlength=self._n_prototypes
+        )
+        for proto_index, required in self._required_words:
+            if prototype_scores[proto_index] and not required <= query_words:
+                prototype_scores[proto_index] = 0.0
+        return np.maximum.reduceat(prototype_scores, self._category_starts)
+
+    def word_coverage(self, text, category):
+        """Share of the query's content words explained by the category's phrases (1.0 without content words)"""
+        words, grams = self._category_words[self.categories.index(category)]
+        content = [word for word in normalize_symptom_text(text).split() if word not in self._generic_words]
+        if not content:
+            return 1.0
+        explained = 0
+        for word in content:
+            if word in words:
+                explained += 1
+            elif len(word) > SHORT_WORD_CHARS:
+                word_grams = char_ngrams(word, self.ngram_size)
+                explained += len(word_grams & grams) >= WORD_MATCH_SHARE * len(word_grams)
+        return explained / len(content)
+
+    def classify(self, text):
+        """Return (category, confidence); category is None when nothing matches"""
+        category_scores = self.scores(text)
+        if len(category_scores) < 2:
+            return None, 0.0
+        runner_up, best = np.partition(category_scores, -2)[-2:]
+        if best <= 0:
+            return None, 0.0
+        category = self.categories[int(np.argmax(category_scores))]
+        # Penalize ambiguity (a close second match) and words the category does not explain
+        confidence = float(np.clip(best - 0.5 * runner_up, 0.0, 1.0)) * self.word_coverage(text, category)
+        return category, confidence
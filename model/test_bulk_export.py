@@ -0,0 +1,29 @@
+"""Bulk ZIP export of assessments: python -m pytest test_bulk_export.py"""
+import json
+import os
+import zipfile
+
+from bulk_export import archive_name, export_reports, read_assessments, synthetic_assessments
+
+
+def test_every_assessment_ends_up_in_the_archive(tmp_path):
+    output = tmp_path / 'reports.zip'
+    stats = export_reports(synthetic_assessments(5), str(output), workers=1)
+    assert (stats['exported'], stats['failed']) == (5, 0)
+    assert os.listdir(tmp_path) == ['reports.zip']
+    with zipfile.ZipFile(output) as archive:
+        names = archive.namelist()
+        assert names == [f"{index:06d}-synthetic-{index}.pdf" for index in range(5)]
+        assert archive.read(names[0]).startswith(b'%PDF')
+
+
+def test_bad_lines_are_skipped(tmp_path):
+    path = tmp_path / 'assessments.jsonl'
+    path.write_text(json.dumps({'patient_name': 'A'}) + '\nnot json\n\n' + json.dumps({'patient_name': 'B'}) + '\n',
+                    encoding='utf-8')
+    assert [assessment['patient_name'] for assessment in read_assessments(str(path))] == ['A', 'B']
+
+
+def test_archive_names_are_safe():
+    assert archive_name(3, {'patient_name': '../Ravi Kumar/'}, '.pdf') == '000003-Ravi_Kumar.pdf'
+    assert archive_name(4, {}, '.txt') == '000004-report.txt'
@@ -0,0 +1,47 @@
+"""Incremental conversation state vs. a rebuild from history: python -m pytest test_conversation_state.py"""
+from conversation_state import ConversationState
+
+CATEGORIES = ['fever', 'cough']
+EXCHANGES = [
+    ("hello", "👋 Hello! I'm your Smart Symptom Checker. How can I help?"),
+    ("I have a fever", "I understand you're experiencing: I have a fever\n\nLet me ask some questions.\n\nCATEGORY:fever"),
+    ("ok", "How high is your temperature?"),
+    ("102", "Do you have chills?")
+]
+
+
+def messages(exchanges):
+    history = []
+    for user, assistant in exchanges:
+        history.append({'role': 'user', 'content': user})
+        history.append({'role': 'assistant', 'content': assistant})
+    return history
+
+
+def test_record_turn_matches_rebuild():
+    state = ConversationState(CATEGORIES)
+    for user, assistant in EXCHANGES:
+        state.record_turn(user, assistant)
+    rebuilt = ConversationState.from_history([list(exchange) for exchange in EXCHANGES], CATEGORIES)
+    for name in ('category', 'questions_asked', 'acknowledged', 'responses', 'turns'):
+        assert getattr(state, name) == getattr(rebuilt, name)
+    assert state.category == 'fever'
+    assert state.acknowledged
+    # The greeting and the acknowledgment are not follow-up questions
+    assert state.questions_asked == 2
+
+
+def test_matches_only_the_history_it_was_built_from():
+    history = messages(EXCHANGES)
+    state = ConversationState.from_history(history, CATEGORIES)
+    assert state.messages_format
+    assert state.matches(history)
+    assert not state.matches(history[:-2])
+    assert not state.matches(history + messages([("no", "Any cough?")]))
+    assert ConversationState(CATEGORIES).matches([])
+
+
+def test_unknown_category_is_ignored():
+    state = ConversationState(CATEGORIES)
+    state.record_turn("rash", "I understand you're experiencing: rash\n\nCATEGORY:skin_rash")
+    assert state.category is None
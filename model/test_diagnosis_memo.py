@@ -0,0 +1,44 @@
+"""Diagnosis memo keys, eviction and expiry: python -m pytest test_diagnosis_memo.py"""
+import diagnosis_memo
+from diagnosis_memo import DiagnosisMemo, age_band, memo_key
+
+
+def test_equivalent_inputs_share_a_key():
+    key = memo_key('fever', ['Yes', 'two days!'], 31, 'Female')
+    assert memo_key('fever', ['yeah', '  Two days '], 40, 'female') == key
+    assert memo_key('fever', ['haan', 'two days'], 44, 'FEMALE') == key
+    # Different answers, age band, gender or language are different diagnoses
+    assert memo_key('fever', ['no', 'two days'], 31, 'Female') != key
+    assert memo_key('fever', ['yes', 'two days'], 45, 'Female') != key
+    assert memo_key('fever', ['yes', 'two days'], 31, 'Male') != key
+    assert memo_key('fever', ['yes', 'two days'], 31, 'Female', 'Hindi') != key
+
+
+def test_age_bands():
+    assert age_band(0) == '0-1'
+    assert age_band('30') == '30-44'
+    assert age_band(74) == '60-74'
+    assert age_band(90) == '75+'
+    assert age_band('unknown') == 'unknown'
+
+
+def test_oldest_entry_is_evicted():
+    memo = DiagnosisMemo(max_entries=2)
+    for category in ('fever', 'cough', 'headache'):
+        memo.put(category, ['yes'], 30, 'Male', f"{category} diagnosis")
+    assert memo.get('fever', ['yes'], 30, 'Male') is None
+    assert memo.get('headache', ['yes'], 30, 'Male') == 'headache diagnosis'
+    stats = memo.stats()
+    assert (stats['evictions'], stats['hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(diagnosis_memo.time, 'time', lambda: now[0])
+    memo = DiagnosisMemo(ttl_seconds=60)
+    memo.put('fever', ['yes'], 30, 'Male', 'diagnosis')
+    now[0] += 59
+    assert memo.get('fever', ['yes'], 30, 'Male') == 'diagnosis'
+    now[0] += 2
+    assert memo.get('fever', ['yes'], 30, 'Male') is None
+    assert memo.stats()['expired'] == 1
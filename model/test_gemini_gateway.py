@@ -0,0 +1,85 @@
+"""Rate limiting, retries and the circuit breaker: python -m pytest test_gemini_gateway.py"""
+import pytest
+
+import gemini_gateway
+from gemini_gateway import CircuitBreaker, GatewayUnavailable, GeminiGateway, TokenBucket
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(gemini_gateway.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_token_bucket_hands_out_waits(clock):
+    bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+    assert bucket.reserve(max_wait=5) == 0.0
+    assert bucket.reserve(max_wait=5) == 0.0
+    # Drained: the next request waits for one token, the one after for two
+    assert bucket.reserve(max_wait=5) == pytest.approx(1.0)
+    assert bucket.reserve(max_wait=1.5) is None
+    clock[0] += 10
+    assert bucket.available() == 2
+
+
+def test_circuit_opens_and_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call while half open
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_retryable_errors_are_retried():
+    gateway = GeminiGateway(max_retries=2, base_delay=0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise QuotaError('quota')
+        return 'ok'
+
+    assert gateway.call(flaky) == 'ok'
+    stats = gateway.stats()
+    assert (stats['retries'], stats['successes'], stats['failures']) == (2, 1, 0)
+
+
+def test_failures_open_the_circuit():
+    gateway = GeminiGateway(max_retries=0, failure_threshold=2, base_delay=0)
+
+    def down():
+        raise ConnectionError('unreachable')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            gateway.call(down)
+    with pytest.raises(GatewayUnavailable):
+        gateway.call(down)
+    stats = gateway.stats()
+    assert (stats['circuit_opened'], stats['short_circuited'], stats['circuit_state']) == (1, 1, 'open')
+
+
+def test_bad_requests_do_not_count_against_the_circuit():
+    gateway = GeminiGateway(max_retries=3, failure_threshold=1, base_delay=0)
+
+    def blocked():
+        raise ValueError('safety block')
+
+    with pytest.raises(ValueError):
+        gateway.call(blocked)
+    assert gateway.stats()['retries'] == 0
+    assert gateway.breaker.state == 'closed'
@@ -0,0 +1,65 @@
+"""Content-addressed report storage: python -m pytest test_report_store.py"""
+import os
+
+import report_store
+from report_store import MemoryReportStore, ReportStore, report_key
+
+
+def render(store, content, suffix='.pdf'):
+    path = store.staging_stem() + suffix
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_repeated_reports_reuse_one_file(tmp_path):
+    store = ReportStore(str(tmp_path), janitor_interval=0)
+    key = report_key('Patient', 30, 'Male', 'English', 'diagnosis', '2026-10-17')
+    assert key == report_key('Patient', 30, 'Male', 'English', 'diagnosis', '2026-10-17')
+    assert store.get(key) is None
+    path = store.put(key, render(store, b'%PDF report'))
+    assert store.get(key) == path
+    assert os.listdir(tmp_path) == [f"{key}.pdf"]
+
+
+def test_least_recently_used_report_is_evicted(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=25, janitor_interval=0)
+    store.put('a', render(store, b'a' * 10))
+    store.put('b', render(store, b'b' * 10))
+    store.get('a')
+    store.put('c', render(store, b'c' * 10))
+    assert store.get('b') is None and not (tmp_path / 'b.pdf').exists()
+    assert store.get('a') and store.get('c')
+    assert store.stats()['evicted_lru'] == 1
+
+
+def test_restart_indexes_reports_and_drops_staging_files(tmp_path):
+    store = ReportStore(str(tmp_path), janitor_interval=0)
+    path = store.put('a', render(store, b'report', '.txt'))
+    render(store, b'half-written')
+    restarted = ReportStore(str(tmp_path), janitor_interval=0)
+    assert restarted.get('a') == path
+    assert os.listdir(tmp_path) == ['a.txt']
+
+
+def test_expired_reports_are_purged(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(report_store.time, 'time', lambda: now[0])
+    store = ReportStore(str(tmp_path), ttl_seconds=60, janitor_interval=0)
+    store.put('a', render(store, b'report'))
+    store.purge_expired()
+    assert os.listdir(tmp_path) == ['a.pdf']
+    now[0] += 61
+    store.purge_expired()
+    assert store.get('a') is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_memory_store_evicts_by_bytes():
+    store = MemoryReportStore(max_bytes=25)
+    store.put('a', b'a' * 10, '.pdf')
+    store.put('b', b'b' * 10, '.pdf')
+    store.put('c', b'c' * 10, '.txt')
+    assert store.get('a') is None
+    assert store.get('c') == (b'c' * 10, '.txt')
+    assert store.stats()['bytes'] == 20
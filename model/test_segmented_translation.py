@@ -0,0 +1,45 @@
+"""Segment splitting and per-segment fallback: python -m pytest test_segmented_translation.py"""
+from segmented_translation import SegmentedTranslator, split_segments
+
+DIAGNOSIS = "🔍 **Possible conditions**\n\n1. Viral fever - 70%\n   - Rest and fluids.\n\n• See a doctor if it lasts."
+
+
+def test_segments_reassemble_exactly():
+    pieces = split_segments(DIAGNOSIS)
+    assert ''.join(prefix + core + suffix for prefix, core, suffix in pieces) == DIAGNOSIS
+    # List markers and indentation are not sent to the translator
+    assert ('   - ', 'Rest and fluids.', '') in pieces
+    assert ('• ', 'See a doctor if it lasts.', '') in pieces
+
+
+def test_long_lines_split_at_sentences():
+    line = ' '.join(f"Sentence number {index} is here." for index in range(20))
+    pieces = split_segments(line, max_chars=100)
+    assert len(pieces) > 1
+    assert all(len(core) <= 100 for _, core, _ in pieces)
+    assert ''.join(prefix + core + suffix for prefix, core, suffix in pieces) == line
+
+
+def test_failed_segment_falls_back_alone():
+    translator = SegmentedTranslator(max_workers=2, retries=1, backoff=0)
+
+    def translate_segment(core):
+        if 'doctor' in core:
+            raise ConnectionError('translator down')
+        return core.upper()
+
+    translated, timings = translator.translate(DIAGNOSIS, translate_segment, fallback=lambda core: f"[{core}]")
+    assert '   - REST AND FLUIDS.' in translated
+    assert '• [See a doctor if it lasts.]' in translated
+    statuses = {timing['status'] for timing in timings}
+    assert statuses == {'ok', 'fallback'}
+    stats = translator.stats()
+    assert stats['fallbacks'] == 1
+    assert stats['retries'] == 1
+
+
+def test_untranslatable_segment_keeps_the_source():
+    translator = SegmentedTranslator(retries=0, backoff=0)
+    translated, timings = translator.translate("Rest.", lambda core: None)
+    assert translated == "Rest."
+    assert timings[0]['status'] == 'failed'
@@ -0,0 +1,40 @@
+"""Session eviction by count, bytes and idle time: python -m pytest test_session_store.py"""
+import session_store
+from session_store import SessionStore
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    store.put('a', {'name': 'a'})
+    store.put('b', {'name': 'b'})
+    store.get('a')  # b is now the least recently used
+    store.put('c', {'name': 'c'})
+    assert store.get('b') is None
+    assert store.get('a') == {'name': 'a'}
+    assert store.stats()['evicted_lru'] == 1
+
+
+def test_byte_budget_keeps_the_newest_session():
+    store = SessionStore(max_bytes=100, size_of=lambda session: session['size'])
+    store.put('a', {'size': 60})
+    store.put('b', {'size': 60})
+    assert store.get('a') is None
+    assert store.stats()['evicted_memory'] == 1
+    # A single session over the budget is still kept
+    store.put('c', {'size': 500})
+    assert store.get('c') == {'size': 500}
+    assert store.stats()['sessions'] == 1
+
+
+def test_idle_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, 'time', lambda: now[0])
+    store = SessionStore(idle_ttl=60)
+    store.get_or_create('a')['name'] = 'a'
+    now[0] += 30
+    assert store.get('a') == {'name': 'a'}
+    now[0] += 61
+    assert store.get('a') is None
+    assert store.get_or_create('a') == {}
+    assert store.stats()['expired'] == 1
+    assert store.stats()['created'] == 2
@@ -0,0 +1,53 @@
+"""SingleFlight under turn budgets: python -m pytest test_single_flight.py"""
+import asyncio
+
+from single_flight import SingleFlight
+from turn_budget import TurnBudget
+
+
+async def slow_upstream(calls, seconds=1.0):
+    calls.append(seconds)
+    await asyncio.sleep(seconds)
+    return 'upstream'
+
+
+def test_leader_timeout_does_not_cancel_follower():
+    flights = SingleFlight()
+    calls = []
+
+    async def turn(budget_seconds):
+        budget = TurnBudget(budget_seconds)
+        return await budget.run('translation', flights.do_async('key', slow_upstream, calls),
+                                lambda: 'fallback'), budget.degraded
+
+    async def main():
+        leader = asyncio.create_task(turn(0.5))
+        await asyncio.sleep(0)  # the leader starts the flight
+        follower = asyncio.create_task(turn(5))
+        return await leader, await follower
+
+    (leader_result, leader_degraded), (follower_result, follower_degraded) = asyncio.run(main())
+    assert (leader_result, leader_degraded) == ('fallback', ['translation'])
+    assert (follower_result, follower_degraded) == ('upstream', [])
+    assert len(calls) == 1
+    assert flights.stats() == {'upstream_calls': 1, 'coalesced': 1, 'shared_errors': 0, 'in_flight': 0}
+
+
+def test_errors_are_shared_with_followers():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError('upstream down')
+
+    async def call():
+        try:
+            return await flights.do_async('key', failing)
+        except ValueError as e:
+            return str(e)
+
+    async def main():
+        return await asyncio.gather(call(), call())
+
+    assert asyncio.run(main()) == ['upstream down', 'upstream down']
+    assert flights.stats()['shared_errors'] == 1
@@ -0,0 +1,27 @@
+"""Offline classifier at LOCAL_CLASSIFIER_THRESHOLD: python -m pytest test_symptom_classifier.py"""
+import app
+from benchmark import LOCAL_CLASSIFIER_SAMPLES
+
+
+def test_answers_above_threshold_are_correct():
+    classifier = app.get_symptom_classifier()
+    answered = []
+    for text, expected in LOCAL_CLASSIFIER_SAMPLES:
+        category, confidence = classifier.classify(text)
+        if category and confidence >= app.LOCAL_CLASSIFIER_THRESHOLD:
+            answered.append((text, category, expected))
+    # Wrong answers include samples that must go to Gemini (expected None)
+    assert [(text, category) for text, category, expected in answered if category != expected] == []
+    assert len(answered) >= 30
+
+
+def test_unexplained_words_lower_confidence():
+    classifier = app.get_symptom_classifier()
+    category, confidence = classifier.classify("I have a bad cough")
+    assert category == 'cough' and confidence >= app.LOCAL_CLASSIFIER_THRESHOLD
+    _, confidence = classifier.classify("I am coughing blood")
+    assert confidence < app.LOCAL_CLASSIFIER_THRESHOLD
+
+
+def test_nothing_matches():
+    assert app.get_symptom_classifier().classify("") == (None, 0.0)
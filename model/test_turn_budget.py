@@ -0,0 +1,49 @@
+"""Turn deadline and local fallbacks: python -m pytest test_turn_budget.py"""
+import asyncio
+
+from turn_budget import TurnBudget
+
+
+async def reply(value, seconds):
+    await asyncio.sleep(seconds)
+    return value
+
+
+async def chunks(count, seconds):
+    for index in range(count):
+        await asyncio.sleep(seconds)
+        yield index
+
+
+def test_call_in_time_is_not_degraded():
+    budget = TurnBudget(1)
+    assert asyncio.run(budget.run('detection', reply('upstream', 0.01), lambda: 'fallback')) == 'upstream'
+    assert budget.degraded == []
+
+
+def test_slow_call_falls_back():
+    budget = TurnBudget(0.3, min_call_seconds=0.05)
+    assert asyncio.run(budget.run('translation', reply('upstream', 5), lambda: 'fallback')) == 'fallback'
+    assert budget.degraded == ['translation']
+
+
+def test_spent_budget_skips_the_call():
+    budget = TurnBudget(0)
+    awaitable = reply('upstream', 0)
+    assert asyncio.run(budget.run('detection', awaitable, lambda: 'fallback')) == 'fallback'
+    # The skipped coroutine is closed rather than left unawaited
+    assert awaitable.cr_frame is None
+    assert budget.degraded == ['detection']
+
+
+def test_stream_keeps_chunks_produced_in_time():
+    async def collect(budget, stream):
+        return [chunk async for chunk in budget.stream('diagnosis', stream, lambda: 'fallback')]
+
+    budget = TurnBudget(0.35, min_call_seconds=0.05)
+    produced = asyncio.run(collect(budget, chunks(10, 0.1)))
+    assert 1 <= len(produced) < 10 and 'fallback' not in produced
+    assert budget.degraded == ['diagnosis']
+
+    budget = TurnBudget(0.2, min_call_seconds=0.05)
+    assert asyncio.run(collect(budget, chunks(1, 5))) == ['fallback']
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TranslationCache:
+    """Two-tier translation memo: bounded in-process LRU in front of SQLite.
+
+    Keys are (sha256 of the source text, target language code). Only entries
+    put with persist=True (fixed template strings such as questions and
+    notices) go to the SQLite file, which survives restarts; free text from a
+    conversation stays in memory. Entries older than ttl_seconds are treated
+    as misses and purged.
+    """
+
+    def __init__(self, db_path, max_entries=2048, ttl_seconds=30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0,
+            'writes': 0
+        }
+
+        try:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS template_translations ("
+                " text_hash TEXT NOT NULL,"
+                " lang TEXT NOT NULL,"
+                " translated TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (text_hash, lang))"
+            )
+            self._db.commit()
+            self.purge_expired()
+        except (OSError, sqlite3.Error) as e:
+            # Memory tier still works without the persistent store
+            print(f"Translation cache store unavailable ({db_path}): {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(text, lang_code):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest(), lang_code
+
+    def get(self, text, lang_code):
+        """Cached translation or None"""
+        key = self.make_key(text, lang_code)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translated, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return translated
+                del self._memory[key]
+                self.counters['expired'] += 1
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT translated, created_at FROM template_translations WHERE text_hash = ? AND lang = ?",
+                        key
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"Translation cache read failed: {e}")
+                    row = None
+                if row and now - row[1] < self.ttl_seconds:
+                    self._remember(key, row[0], row[1])
+                    self.counters['disk_hits'] += 1
+                    return row[0]
+
+            self.counters['misses'] += 1
+            return None
+
+    def put(self, text, lang_code, translated, persist=False):
+        """Remember a translation; persist=True also writes it to disk (templates only)"""
+        if not translated:
+            return
+        key = self.make_key(text, lang_code)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, translated, now)
+            self.counters['writes'] += 1
+            if persist and self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO template_translations VALUES (?, ?, ?, ?)",
+                        (key[0], key[1], translated, now)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Translation cache write failed: {e}")
+
+    def _remember(self, key, translated, created_at):
+        """Insert into the LRU tier; caller holds the lock"""
+        self._memory[key] = (translated, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def purge_expired(self):
+        """Drop expired rows from the persistent store"""
+        if self._db is None:
+            return 0
+        with self._lock:
+            try:
+                cursor = self._db.execute(
+                    "DELETE FROM template_translations WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache purge failed: {e}")
+                return 0
+            self.counters['expired'] += cursor.rowcount
+            return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['max_entries'] = self.max_entries
+            stats['persistent'] = self._db is not None
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+
+class TurnBudget:
+    """Deadline for one chat turn, shared by every upstream call it makes.
+
+    run()/stream() give each call whatever time is left; when it runs out
+    (or less than min_call_seconds remains) the step's local fallback is
+    used instead and the step is recorded in degraded.
+    """
+
+    def __init__(self, seconds, min_call_seconds=0.25):
+        self.seconds = seconds
+        self.min_call_seconds = min_call_seconds
+        self.deadline = time.monotonic() + seconds
+        self.degraded = []  # steps that used a local fallback, in order
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _degrade(self, step):
+        if step not in self.degraded:
+            self.degraded.append(step)
+        print(f"DEBUG: Turn budget exhausted during {step}, using local fallback")
+
+    async def run(self, step, awaitable, fallback):
+        """Result of awaitable if it finishes in time, else fallback()"""
+        remaining = self.remaining()
+        if remaining < self.min_call_seconds:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self._degrade(step)
+            return fallback()
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            self._degrade(step)
+            return fallback()
+
+    async def stream(self, step, chunks, fallback):
+        """Yield chunks until the deadline; fallback() replaces a stream that produced nothing"""
+        produced = False
+        try:
+            while True:
+                remaining = self.remaining()
+                if remaining < self.min_call_seconds:
+                    raise asyncio.TimeoutError
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                except StopAsyncIteration:
+                    return
+                produced = True
+                yield chunk
+        except asyncio.TimeoutError:
+            self._degrade(step)
+            if not produced:
+                yield fallback()
+        finally:
+            await chunks.aclose()